@@ -1,10 +1,32 @@
 # -*- coding: utf-8 -*-
 
+import functools
+
 from odoo import api, fields, models, Command, _
 from odoo.exceptions import UserError, ValidationError
 from datetime import date
 
 
+@functools.lru_cache(maxsize=4096)
+def parse_analytic_distribution_key(key):
+    """Return the analytic account IDs of an analytic distribution key.
+
+    Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410').
+    The same keys come back on most lines, so the parsed keys are cached.
+    """
+    return tuple(int(aid) for aid in (part.strip() for part in str(key).split(',')) if aid.isdigit())
+
+
+def get_analytic_account_ids(distributions):
+    """Return the set of IDs of the analytic accounts used in the distributions."""
+    return {
+        account_id
+        for distribution in distributions
+        for key in distribution or {}
+        for account_id in parse_analytic_distribution_key(key)
+    }
+
+
 class PctPettyCash(models.Model):
     _name = 'pct.petty.cash'
     _description = 'Petty Cash Custodian'
@@ -359,10 +381,7 @@ class PctPettyCashAllocation(models.Model):
 
         # Get analytic accounts from distribution
         # Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410')
-        analytic_account_ids = set()
-        for key in self.analytic_distribution.keys():
-            for aid in str(key).split(','):
-                analytic_account_ids.add(int(aid.strip()))
+        analytic_account_ids = get_analytic_account_ids([self.analytic_distribution])
 
         if not analytic_account_ids:
             raise UserError(_('Analytic distribution is required before posting allocation lines.'))
@@ -653,10 +672,7 @@ class PctPettyCashExpense(models.Model):
 
         # Get analytic accounts from distribution
         # Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410')
-        analytic_account_ids = set()
-        for key in self.analytic_distribution.keys():
-            for aid in str(key).split(','):
-                analytic_account_ids.add(int(aid.strip()))
+        analytic_account_ids = get_analytic_account_ids([self.analytic_distribution])
 
         if not analytic_account_ids:
             raise UserError(_('Analytic distribution is required before posting expense lines.'))
@@ -3,6 +3,8 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 
+from ..models.pct_petty_cash import get_analytic_account_ids
+
 
 class PctPettyCashExpenseWizard(models.TransientModel):
     _name = 'pct.petty.cash.expense.wizard'
@@ -113,10 +115,7 @@ class PctPettyCashExpenseWizard(models.TransientModel):
 
         # Get analytic accounts from distribution
         # Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410')
-        analytic_account_ids = set()
-        for key in self.analytic_distribution.keys():
-            for aid in str(key).split(','):
-                analytic_account_ids.add(int(aid.strip()))
+        analytic_account_ids = get_analytic_account_ids([self.analytic_distribution])
 
         if not analytic_account_ids:
             raise UserError(_('Analytic distribution is required for expense records.'))
@@ -16,12 +16,17 @@
     'data': [
         'security/ir.model.access.csv',
         'security/project_security.xml',
+        'data/ir_cron_data.xml',
         'views/project_views.xml',
         'views/purchase_order_views.xml',
         'views/account_move_views.xml',
         'views/account_payment_views.xml',
         'views/report_invoice.xml',
         'views/product_category_views.xml',
+        'views/project_sequence_gap_report_views.xml',
+        'views/project_financial_report_views.xml',
+        'views/purchase_project_report_views.xml',
+        'wizard/project_reassign_wizard_views.xml',
     ],
     'installable': True,
     'application': False,
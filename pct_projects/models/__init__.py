@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from . import project
-from . import product_category
\ No newline at end of file
+from . import product_category
+from . import ir_sequence
+from . import project_sequence_gap_report
+from . import project_report_mixin
+from . import project_financial_report
+from . import purchase_project_report
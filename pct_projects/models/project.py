@@ -1,4 +1,8 @@
-from odoo import models, fields, api, _
+import functools
+import json
+from collections import defaultdict
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
 
 # Analytic plan IDs for project and project stage validation
@@ -6,49 +10,77 @@ PROJECT_PLAN_ID = 1
 PROJECT_STAGE_PLAN_ID = 2
 
 
-def validate_analytic_distribution(env, analytic_distribution, record_name="record"):
-    """Validate analytic distribution has both project and project stage.
+@functools.lru_cache(maxsize=4096)
+def parse_analytic_distribution_key(key):
+    """Return the analytic account IDs of an analytic distribution key.
+
+    Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410').
+    The same keys come back on most lines, so the parsed keys are cached.
+
+    Returns:
+        Tuple of analytic account IDs
+    """
+    return tuple(int(aid) for aid in (part.strip() for part in str(key).split(',')) if aid.isdigit())
+
+
+def get_analytic_account_ids(distributions):
+    """Return the IDs of the analytic accounts used in the distributions.
 
     Args:
-        env: Odoo environment
-        analytic_distribution: The analytic distribution dict to validate
-        record_name: Name to use in error messages
+        distributions: Iterable of analytic distribution dicts (or None)
 
-    Raises:
-        ValidationError if validation fails
+    Returns:
+        Set of analytic account IDs
     """
-    if not analytic_distribution:
-        raise ValidationError(_('Analytic distribution is required on %s.') % record_name)
-
-    # Get analytic accounts from distribution
-    # Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410')
-    analytic_account_ids = set()
-    for key in analytic_distribution.keys():
-        for aid in str(key).split(','):
-            try:
-                analytic_account_ids.add(int(aid.strip()))
-            except ValueError:
-                continue
+    return {
+        account_id
+        for distribution in distributions
+        for key in distribution or {}
+        for account_id in parse_analytic_distribution_key(key)
+    }
+
 
+def get_analytic_distribution_error(analytic_distribution, plan_by_account, record_name="record"):
+    """Check that an analytic distribution has both project and project stage.
+
+    Args:
+        analytic_distribution: The analytic distribution dict to check
+        plan_by_account: {analytic account ID: plan ID} map of the accounts of
+            the distribution, see get_analytic_plan_map
+        record_name: Name to use in error messages
+
+    Returns:
+        The error message, or False if the distribution is valid
+    """
+    analytic_account_ids = get_analytic_account_ids([analytic_distribution])
     if not analytic_account_ids:
-        raise ValidationError(_('Analytic distribution is required on %s.') % record_name)
+        return _('Analytic distribution is required on %s.') % record_name
 
     # Check for project and project stage analytic accounts
-    analytic_accounts = env['account.analytic.account'].browse(list(analytic_account_ids))
+    plan_ids = {plan_by_account.get(aid) for aid in analytic_account_ids}
+    if PROJECT_PLAN_ID not in plan_ids:
+        return _('Please select a Project in the analytic distribution on %s.') % record_name
+    if PROJECT_STAGE_PLAN_ID not in plan_ids:
+        return _('Please select a Project Stage in the analytic distribution on %s.') % record_name
+    return False
 
-    has_project = False
-    has_project_stage = False
 
-    for account in analytic_accounts:
-        if account.plan_id.id == PROJECT_PLAN_ID:
-            has_project = True
-        if account.plan_id.id == PROJECT_STAGE_PLAN_ID:
-            has_project_stage = True
+def validate_analytic_distribution(env, analytic_distribution, record_name="record"):
+    """Validate analytic distribution has both project and project stage.
 
-    if not has_project:
-        raise ValidationError(_('Please select a Project in the analytic distribution on %s.') % record_name)
-    if not has_project_stage:
-        raise ValidationError(_('Please select a Project Stage in the analytic distribution on %s.') % record_name)
+    Args:
+        env: Odoo environment
+        analytic_distribution: The analytic distribution dict to validate
+        record_name: Name to use in error messages
+
+    Raises:
+        ValidationError if validation fails
+    """
+    error = get_analytic_distribution_error(
+        analytic_distribution, get_analytic_plan_map(env, [analytic_distribution]), record_name
+    )
+    if error:
+        raise ValidationError(error)
 
 
 class ProjectProjects(models.Model):
@@ -84,51 +116,199 @@ class ProjectProjects(models.Model):
     def _create_invoice_sequence(self):
         """Create invoice sequence for this project based on its prefix."""
         self.ensure_one()
-        if not self.prefix:
-            return False
-        # Search for existing sequence by code
-        sequence = self.env['ir.sequence'].search([
-            ('code', '=', f'pct.project.invoice.{self.prefix}')
-        ], limit=1)
-        if not sequence:
-            sequence = self.env['ir.sequence'].sudo().create({
-                'name': f'Project {self.name} Invoice Sequence',
-                'code': f'pct.project.invoice.{self.prefix}',
-                'prefix': f'{self.prefix}/%(year)s/%(month)s/',
-                'padding': 5,
-                'company_id': self.company_id.id if self.company_id else False,
-            })
-        return sequence
+        return self._create_invoice_sequences().get(self, False)
+
+    def _create_invoice_sequences(self):
+        """Create invoice sequences for the projects based on their prefix.
+
+        Returns:
+            Dict {project: sequence}
+        """
+        projects = self.filtered('prefix')
+        sequences = self._get_invoice_sequences([
+            (project.prefix, project.name, project.company_id.id) for project in projects
+        ])
+        return dict(zip(projects, sequences))
+
+    @api.model
+    def _get_invoice_sequences(self, project_values):
+        """Find or create the invoice sequences of projects.
+
+        The existing sequences of all the prefixes are searched at once, and
+        the missing ones are created together.
+
+        Args:
+            project_values: List of (prefix, project name, company ID)
+
+        Returns:
+            List of sequences, in the order of project_values
+        """
+        codes = [f'pct.project.invoice.{prefix}' for prefix, _name, _company_id in project_values]
+        if not codes:
+            return []
+        # Search for existing sequences by code
+        sequence_by_code = {}
+        sequences = self.env['ir.sequence'].search_fetch([('code', 'in', list(set(codes)))], ['code'])
+        for sequence in sequences:
+            sequence_by_code.setdefault(sequence.code, sequence)
+        vals_by_code = {}
+        for code, (prefix, name, company_id) in zip(codes, project_values):
+            if code not in sequence_by_code and code not in vals_by_code:
+                vals_by_code[code] = {
+                    'name': f'Project {name} Invoice Sequence',
+                    'code': code,
+                    'prefix': f'{prefix}/%(year)s/%(month)s/',
+                    'padding': 5,
+                    'company_id': company_id or False,
+                }
+        if vals_by_code:
+            sequences = self.env['ir.sequence'].sudo().create(list(vals_by_code.values()))
+            sequence_by_code.update(zip(vals_by_code, sequences))
+        return [sequence_by_code[code] for code in codes]
+
+    def _set_invoice_sequences(self):
+        """Auto-create invoice sequence for projects with prefix and without sequence.
+
+        The projects are written once per sequence.
+        """
+        projects = self.filtered(lambda p: p.prefix and not p.invoice_sequence_id)
+        project_ids_by_sequence = defaultdict(list)
+        for project, sequence in projects._create_invoice_sequences().items():
+            project_ids_by_sequence[sequence].append(project.id)
+        for sequence, project_ids in project_ids_by_sequence.items():
+            self.browse(project_ids).invoice_sequence_id = sequence
+
+    @api.model
+    def _add_invoice_sequences(self, vals_list):
+        """Set the invoice sequence in the values of the projects created with
+        a prefix, so that the projects are not written again after creation."""
+        new_vals_list = [
+            vals for vals in vals_list
+            if vals.get('prefix') and not vals.get('invoice_sequence_id')
+        ]
+        if not new_vals_list:
+            return
+        # The company of the project defaults to the one of its analytic account
+        accounts = self.env['account.analytic.account'].browse(
+            {vals['account_id'] for vals in new_vals_list if vals.get('account_id')}
+        )
+        company_by_account = {account.id: account.company_id.id for account in accounts}
+        sequences = self._get_invoice_sequences([
+            (
+                vals['prefix'],
+                vals.get('name', ''),
+                vals.get('company_id') or company_by_account.get(vals.get('account_id')),
+            )
+            for vals in new_vals_list
+        ])
+        for vals, sequence in zip(new_vals_list, sequences):
+            vals['invoice_sequence_id'] = sequence.id
 
     @api.model_create_multi
     def create(self, vals_list):
-        projects = super().create(vals_list)
         # Auto-create invoice sequence for projects with prefix
-        for project in projects:
-            if project.prefix and not project.invoice_sequence_id:
-                project.invoice_sequence_id = project._create_invoice_sequence()
+        self._add_invoice_sequences(vals_list)
+        projects = super().create(vals_list)
+        if projects.partner_id:
+            self.env.registry.clear_cache()
         return projects
 
     def write(self, vals):
         res = super().write(vals)
         # Auto-create invoice sequence if prefix is set/changed
         if 'prefix' in vals:
-            for project in self:
-                if project.prefix and not project.invoice_sequence_id:
-                    project.invoice_sequence_id = project._create_invoice_sequence()
+            self._set_invoice_sequences()
+        if {'partner_id', 'company_id', 'active'} & set(vals):
+            self.env.registry.clear_cache()
         return res
 
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_projects_by_partner(self):
+        """Return the active projects of every customer, cached.
+
+        The map is invalidated whenever a project is created, deleted or has
+        its customer, company or active flag written.
+
+        Returns:
+            Dict {partner ID: ((project ID, company ID), ...)}
+        """
+        projects = self.sudo().search_fetch([('partner_id', '!=', False)], ['partner_id', 'company_id'])
+        projects_by_partner = defaultdict(list)
+        for project in projects:
+            projects_by_partner[project.partner_id.id].append((project.id, project.company_id.id))
+        return tools.frozendict({
+            partner_id: tuple(partner_projects)
+            for partner_id, partner_projects in projects_by_partner.items()
+        })
+
+    @api.model
+    def _get_single_project_by_partner(self, partner_ids):
+        """Find the partners having exactly one project in the current companies.
+
+        The cached map is built without access rules, only the projects the
+        user can read are counted.
+
+        Returns:
+            Dict {partner ID: project ID}
+        """
+        projects_by_partner = self._get_projects_by_partner()
+        company_ids = {False, *self.env.companies.ids}
+        candidate_ids_by_partner = {
+            partner_id: [
+                project_id
+                for project_id, company_id in projects_by_partner.get(partner_id, ())
+                if company_id in company_ids
+            ]
+            for partner_id in partner_ids
+        }
+        readable_ids = set(self.browse([
+            project_id for project_ids in candidate_ids_by_partner.values() for project_id in project_ids
+        ])._filtered_access('read').ids)
+        single_project_by_partner = {}
+        for partner_id, candidate_ids in candidate_ids_by_partner.items():
+            project_ids = [project_id for project_id in candidate_ids if project_id in readable_ids]
+            if len(project_ids) == 1:
+                single_project_by_partner[partner_id] = project_ids[0]
+        return single_project_by_partner
+
 
 # =====================================================================
 # Purchase Order Integration
 # =====================================================================
-def replace_project_analytic(env, existing_distribution, new_project_account_id):
+def get_analytic_plan_map(env, distributions):
+    """Read the plan of every analytic account used in the distributions at once.
+
+    Args:
+        env: Odoo environment
+        distributions: Iterable of analytic distribution dicts (or None)
+
+    Returns:
+        Dict {analytic account ID: plan ID}
+    """
+    account_ids = get_analytic_account_ids(distributions)
+    if not account_ids:
+        return {}
+    accounts = env['account.analytic.account'].with_context(active_test=False).search_fetch(
+        [('id', 'in', list(account_ids))], ['plan_id']
+    )
+    return {account.id: account.plan_id.id for account in accounts}
+
+
+def replace_project_analytic(env, existing_distribution, new_project_account_id, plan_by_account=None):
     """Replace the project analytic account in a distribution, keeping other plans.
 
     Args:
         env: Odoo environment
         existing_distribution: Current analytic distribution dict (or None)
         new_project_account_id: ID of the new project's analytic account
+        plan_by_account: Optional {analytic account ID: plan ID} map, see
+            get_analytic_plan_map; read from the database when not given
 
     Returns:
         Updated analytic distribution dict
@@ -136,25 +316,29 @@ def replace_project_analytic(env, existing_distribution, new_project_account_id)
     if not existing_distribution:
         return {str(new_project_account_id): 100}
 
+    if plan_by_account is None:
+        plan_by_account = get_analytic_plan_map(env, [existing_distribution])
+
     new_distribution = {}
 
     # Process existing distribution - remove old project plan accounts, keep others
     for key, percentage in existing_distribution.items():
         # Keys can be single IDs or comma-separated IDs
-        account_ids = [int(aid.strip()) for aid in str(key).split(',') if aid.strip().isdigit()]
+        account_ids = parse_analytic_distribution_key(key)
 
         # Check if any of these accounts belong to the Project plan (id=1)
-        accounts = env['account.analytic.account'].browse(account_ids)
-        non_project_accounts = accounts.filtered(lambda a: a.plan_id.id != PROJECT_PLAN_ID)
+        non_project_account_ids = [
+            aid for aid in account_ids if plan_by_account.get(aid) != PROJECT_PLAN_ID
+        ]
 
-        if non_project_accounts:
+        if non_project_account_ids:
             # Keep the non-project accounts with their percentage
-            if len(non_project_accounts) == len(accounts):
+            if len(non_project_account_ids) == len(account_ids):
                 # All accounts are non-project, keep the key as-is
                 new_distribution[key] = percentage
             else:
                 # Some accounts were project accounts, rebuild key with only non-project ones
-                new_key = ','.join(str(a.id) for a in non_project_accounts)
+                new_key = ','.join(str(aid) for aid in non_project_account_ids)
                 new_distribution[new_key] = percentage
 
     # Add the new project analytic account
@@ -163,23 +347,74 @@ def replace_project_analytic(env, existing_distribution, new_project_account_id)
     return new_distribution
 
 
+class AnalyticMixin(models.AbstractModel):
+    _inherit = 'analytic.mixin'
+
+    def _get_project_analytic_distributions(self, new_project_account_id):
+        """Compute the distributions of the records with the project replaced.
+
+        The plans of all the accounts used by the records are read at once.
+
+        Returns:
+            Dict {record: new analytic distribution}
+        """
+        plan_by_account = get_analytic_plan_map(self.env, self.mapped('analytic_distribution'))
+        return {
+            record: replace_project_analytic(
+                self.env, record.analytic_distribution, new_project_account_id, plan_by_account
+            )
+            for record in self
+        }
+
+    def _get_analytic_distribution_errors(self, get_record_name):
+        """Validate the analytic distribution of all the records at once.
+
+        The plans of all the accounts used by the records are read at once.
+
+        Args:
+            get_record_name: Function returning the name of a record to use
+                in error messages
+
+        Returns:
+            List of error messages, one per invalid record
+        """
+        plan_by_account = get_analytic_plan_map(self.env, self.mapped('analytic_distribution'))
+        errors = []
+        for record in self:
+            error = get_analytic_distribution_error(
+                record.analytic_distribution, plan_by_account, get_record_name(record)
+            )
+            if error:
+                errors.append(error)
+        return errors
+
+    def _replace_project_analytic(self, new_project_account_id):
+        """Replace the project analytic account on all the records.
+
+        The records are written once per distinct resulting distribution.
+        """
+        ids_by_distribution = defaultdict(list)
+        for record, distribution in self._get_project_analytic_distributions(new_project_account_id).items():
+            if distribution != record.analytic_distribution:
+                ids_by_distribution[json.dumps(distribution, sort_keys=True)].append(record.id)
+        for distribution, ids in ids_by_distribution.items():
+            self.browse(ids).write({'analytic_distribution': json.loads(distribution)})
+
+
 class PurchaseOrder(models.Model):
     _inherit = 'purchase.order'
 
-    project_id = fields.Many2one('project.project', string='Project', tracking=True)
+    project_id = fields.Many2one('project.project', string='Project', tracking=True, index=True)
 
     @api.onchange('project_id')
     def _onchange_project_id_set_analytic(self):
         """Auto-fill analytic distribution on lines when project is set."""
         if self.project_id and self.project_id.account_id:
-            for line in self.order_line:
-                if line.display_type not in ('line_section', 'line_note'):
-                    # Replace project analytic, keep other plans (like project stage)
-                    line.analytic_distribution = replace_project_analytic(
-                        self.env,
-                        line.analytic_distribution,
-                        self.project_id.account_id.id
-                    )
+            lines = self.order_line.filtered(lambda l: l.display_type not in ('line_section', 'line_note'))
+            # Replace project analytic, keep other plans (like project stage)
+            distributions = lines._get_project_analytic_distributions(self.project_id.account_id.id)
+            for line, distribution in distributions.items():
+                line.analytic_distribution = distribution
 
     def button_confirm(self):
         """Override to require analytic distribution on all lines before confirmation."""
@@ -217,15 +452,14 @@ class PurchaseOrderLine(models.Model):
     @api.constrains('analytic_distribution')
     def _check_analytic_distribution(self):
         """Validate analytic distribution has project and project stage."""
-        for line in self:
-            if line.display_type in ('line_section', 'line_note'):
-                continue
-            if line.analytic_distribution:
-                validate_analytic_distribution(
-                    self.env,
-                    line.analytic_distribution,
-                    _("Purchase Order Line '%s'") % (line.name or line.product_id.name or 'Unknown')
-                )
+        lines = self.filtered(
+            lambda l: l.display_type not in ('line_section', 'line_note') and l.analytic_distribution
+        )
+        errors = lines._get_analytic_distribution_errors(
+            lambda l: _("Purchase Order Line '%s'") % (l.name or l.product_id.name or 'Unknown')
+        )
+        if errors:
+            raise ValidationError('\n'.join(errors))
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -261,11 +495,13 @@ class AccountMove(models.Model):
         string='Project',
         tracking=True,
         required=True,
+        index=True,
     )
     project_sequence_number = fields.Char(
         string='Project Sequence Number',
         readonly=True,
         copy=False,
+        index='btree_not_null',
         help="Project-specific invoice sequence number for reporting."
     )
 
@@ -274,14 +510,11 @@ class AccountMove(models.Model):
         """Auto-fill analytic distribution on invoice lines when project is set."""
         for move in self:
             if move.project_id and move.project_id.account_id:
-                for line in move.invoice_line_ids:
-                    if line.display_type == 'product':
-                        # Replace project analytic, keep other plans (like project stage)
-                        line.analytic_distribution = replace_project_analytic(
-                            self.env,
-                            line.analytic_distribution,
-                            move.project_id.account_id.id
-                        )
+                lines = move.invoice_line_ids.filtered(lambda l: l.display_type == 'product')
+                # Replace project analytic, keep other plans (like project stage)
+                distributions = lines._get_project_analytic_distributions(move.project_id.account_id.id)
+                for line, distribution in distributions.items():
+                    line.analytic_distribution = distribution
 
     @api.onchange('project_id')
     def _onchange_project_id_set_partner(self):
@@ -302,70 +535,152 @@ class AccountMove(models.Model):
                 continue
             # Only auto-set if project is not already set
             if move.partner_id and not move.project_id:
-                projects = self.env['project.project'].search([
-                    ('partner_id', '=', move.partner_id.id),
-                ], limit=2)
                 # Only auto-set if exactly one project exists for this partner
-                if len(projects) == 1:
-                    move.project_id = projects
+                project_id = self.env['project.project']._get_single_project_by_partner(move.partner_id.ids).get(move.partner_id.id)
+                if project_id:
+                    move.project_id = project_id
+
+    @api.model
+    def _set_project_from_partner(self, vals_list):
+        """For invoices created without project (imports, EDI): set the project of the partner.
+
+        Same rule as the partner onchange, for all the invoices at once: the
+        project is only set if the partner has exactly one project.
+        """
+        default_move_type = self.env.context.get('default_move_type', 'entry')
+        vals_without_project = [
+            vals for vals in vals_list
+            if not vals.get('project_id')
+            and vals.get('partner_id')
+            and vals.get('move_type', default_move_type) in ('out_invoice', 'out_refund')
+        ]
+        if not vals_without_project:
+            return
+        project_by_partner = self.env['project.project']._get_single_project_by_partner(
+            {vals['partner_id'] for vals in vals_without_project}
+        )
+        for vals in vals_without_project:
+            if vals['partner_id'] in project_by_partner:
+                vals['project_id'] = project_by_partner[vals['partner_id']]
 
     def _assign_project_sequence_number(self):
-        """Assign project sequence number only for customer invoices (not bills)."""
-        for move in self:
-            # Only apply to customer invoices, not vendor bills
-            if move.move_type != 'out_invoice':
-                continue
-            if move.project_sequence_number:
-                continue
-            if not move.project_id or not move.project_id.invoice_sequence_id:
-                continue
-            move.project_sequence_number = move.project_id.invoice_sequence_id.next_by_id()
+        """Assign project sequence number only for customer invoices (not bills).
+
+        The numbers of all the invoices of a project are reserved with one call
+        to its sequence, in the order of creation of the invoices.
+        """
+        moves = self.filtered(
+            lambda m: m.move_type == 'out_invoice'
+            and not m.project_sequence_number
+            and m.project_id.invoice_sequence_id
+        )
+        moves_by_sequence = moves.sorted('id').grouped(lambda m: m.project_id.invoice_sequence_id)
+        for sequence, sequence_moves in moves_by_sequence.items():
+            numbers = sequence._next_block(len(sequence_moves))
+            for move, number in zip(sequence_moves, numbers):
+                move.project_sequence_number = number
 
     @api.model_create_multi
     def create(self, vals_list):
+        self._set_project_from_partner(vals_list)
         moves = super().create(vals_list)
         # Assign project sequence numbers after creation (only for customer invoices)
-        for move in moves:
-            if move.move_type == 'out_invoice' and move.project_id and move.project_id.invoice_sequence_id and not move.project_sequence_number:
-                move._assign_project_sequence_number()
+        moves._assign_project_sequence_number()
         return moves
 
     def write(self, vals):
-        # Check if project_id needs to be set from invoice_origin (PO reference)
-        for move in self:
-            if not move.project_id and not vals.get('project_id'):
-                origin = vals.get('invoice_origin') or move.invoice_origin
-                if origin:
-                    project_id = self._get_project_from_order(origin)
-                    if project_id:
-                        vals['project_id'] = project_id
+        res = True
+        for moves, move_vals in self._split_write_vals_by_project(vals):
+            res = super(AccountMove, moves).write(move_vals) and res
 
-        res = super().write(vals)
-
-        # Handle project changes - assign sequence number only for customer invoices
-        if 'project_id' in vals:
-            for move in self:
-                if move.move_type == 'out_invoice' and move.project_id and move.project_id.invoice_sequence_id and not move.project_sequence_number:
-                    move._assign_project_sequence_number()
+            # Handle project changes - assign sequence number only for customer invoices
+            if 'project_id' in move_vals:
+                moves._assign_project_sequence_number()
 
         return res
 
+    def _split_write_vals_by_project(self, vals):
+        """Split a write by the project to set from invoice_origin (PO reference).
+
+        Only the writes that touch the origin or the project need the lookup,
+        and the orders of all the moves are then read at once.
+
+        Returns:
+            List of (moves, vals) pairs
+        """
+        if vals.get('project_id') or not {'invoice_origin', 'project_id'} & set(vals):
+            return [(self, vals)]
+        # Only the moves without project get it from their order, an explicit
+        # False clears the project of the others
+        moves = self.filtered(lambda m: not m.project_id)
+        origin_by_move = {
+            move: vals.get('invoice_origin') or move.invoice_origin
+            for move in moves
+        }
+        project_by_origin = self._get_projects_from_orders(
+            [origin for origin in origin_by_move.values() if origin]
+        )
+        move_ids_by_project = defaultdict(list)
+        for move, origin in origin_by_move.items():
+            project_id = project_by_origin.get(origin)
+            if project_id:
+                move_ids_by_project[project_id].append(move.id)
+        if not move_ids_by_project:
+            return [(self, vals)]
+        vals_by_moves = [
+            (self.browse(move_ids), dict(vals, project_id=project_id))
+            for project_id, move_ids in move_ids_by_project.items()
+        ]
+        other_moves = self - self.browse([
+            move_id for move_ids in move_ids_by_project.values() for move_id in move_ids
+        ])
+        if other_moves:
+            vals_by_moves.append((other_moves, vals))
+        return vals_by_moves
+
+    def _get_projects_from_orders(self, origins):
+        """Fetch the project_id of the Purchase Orders named after the origins.
+
+        Returns:
+            Dict {origin: project ID}
+        """
+        if not origins:
+            return {}
+        orders = self.env['purchase.order'].search_fetch(
+            [('name', 'in', list(set(origins)))], ['name', 'project_id']
+        )
+        project_by_origin = {}
+        for order in orders:
+            project_by_origin.setdefault(order.name, order.project_id.id)
+        return {origin: project_id for origin, project_id in project_by_origin.items() if project_id}
+
     def _get_project_from_order(self, origin):
         """Fetch project_id from related Purchase Order."""
-        if not origin:
-            return False
-        order = self.env['purchase.order'].search([('name', '=', origin)], limit=1)
-        return order.project_id.id if order and order.project_id else False
+        return self._get_projects_from_orders([origin] if origin else []).get(origin, False)
 
     def action_post(self):
         """Override to require analytic distribution on all lines before posting."""
-        for move in self:
-            if move.move_type in ('out_invoice', 'out_refund', 'in_invoice', 'in_refund'):
-                for line in move.invoice_line_ids:
-                    if line.display_type == 'product' and not line.analytic_distribution:
-                        raise ValidationError(_("Analytic distribution is required on all invoice/bill lines before posting."))
+        self._check_analytic_distribution_before_post()
         return super().action_post()
 
+    def _check_analytic_distribution_before_post(self):
+        """Validate the analytic distribution of the lines of all the invoices/bills.
+
+        The lines of all the moves are checked with one read of the analytic
+        plans, and all the invalid lines are reported in a single error.
+        """
+        lines = self.filtered(
+            lambda m: m.move_type in ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+        ).invoice_line_ids.filtered(lambda l: l.display_type == 'product')
+        errors = lines._get_analytic_distribution_errors(
+            lambda l: '%s - %s' % (l.move_id.display_name, l._get_analytic_record_name())
+        )
+        if errors:
+            raise ValidationError(
+                _("Analytic distribution with a Project and a Project Stage is required on all invoice/bill lines before posting:\n%s")
+                % '\n'.join(errors)
+            )
+
 
 # =====================================================================
 # Account Move Line Integration
@@ -388,20 +703,20 @@ class AccountMoveLine(models.Model):
     @api.constrains('analytic_distribution')
     def _check_analytic_distribution(self):
         """Validate analytic distribution has project and project stage."""
-        for line in self:
-            # Only validate product lines on invoices/bills
-            if line.display_type != 'product':
-                continue
-            if not line.move_id or line.move_id.move_type not in (
-                'out_invoice', 'out_refund', 'in_invoice', 'in_refund'
-            ):
-                continue
-            if line.analytic_distribution:
-                validate_analytic_distribution(
-                    self.env,
-                    line.analytic_distribution,
-                    _("Invoice/Bill Line '%s'") % (line.name or line.product_id.name or 'Unknown')
-                )
+        # Only validate product lines on invoices/bills
+        lines = self.filtered(
+            lambda l: l.display_type == 'product'
+            and l.move_id.move_type in ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+            and l.analytic_distribution
+        )
+        errors = lines._get_analytic_distribution_errors(lambda l: l._get_analytic_record_name())
+        if errors:
+            raise ValidationError('\n'.join(errors))
+
+    def _get_analytic_record_name(self):
+        """Name of the line in analytic distribution error messages."""
+        self.ensure_one()
+        return _("Invoice/Bill Line '%s'") % (self.name or self.product_id.name or 'Unknown')
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -429,6 +744,7 @@ class AccountPayment(models.Model):
         'project.project',
         string='Project',
         tracking=True,
+        index=True,
     )
 
     @api.constrains('payment_type', 'project_id')
@@ -442,40 +758,53 @@ class AccountPayment(models.Model):
         """Extend to sync project_id from payment to its journal entry."""
         res = super()._synchronize_to_moves(changed_fields)
         if 'project_id' in changed_fields:
-            for payment in self.filtered(lambda p: p.move_id):
-                payment.move_id.project_id = payment.project_id
-                # Also update analytic distribution on bank lines
-                if payment.project_id:
-                    payment._set_analytic_on_bank_lines()
+            self._set_project_on_moves()
         return res
 
+    def _set_project_on_moves(self):
+        """Set the project of the payments and its analytic on their journal entries.
+
+        The entries are written once per project, the project is cleared on
+        the entries of the payments without project.
+        """
+        payments = self.filtered('move_id')
+        for project, project_payments in payments.grouped('project_id').items():
+            moves = project_payments.move_id.filtered(lambda m: m.project_id != project)
+            if moves:
+                moves.project_id = project
+        # Also update analytic distribution on bank lines
+        payments._set_analytic_on_bank_lines()
+
     def _set_analytic_on_bank_lines(self):
-        """Set analytic distribution from project on bank/liquidity lines."""
-        self.ensure_one()
-        if not self.project_id or not self.move_id:
-            return
+        """Set analytic distribution from project on bank/liquidity lines.
 
-        analytic_distribution = self.project_id._get_analytic_distribution()
-        if not analytic_distribution:
-            return
+        The bank lines of all the payments are written once per distribution.
+        """
+        line_ids_by_distribution = defaultdict(list)
+        for payment in self:
+            if not payment.project_id or not payment.move_id:
+                continue
 
-        # Get bank/liquidity accounts from journals
-        bank_accounts = self.journal_id.default_account_id
-        if hasattr(self, 'destination_journal_id') and self.destination_journal_id:
-            bank_accounts |= self.destination_journal_id.default_account_id
+            analytic_distribution = payment.project_id._get_analytic_distribution()
+            if not analytic_distribution:
+                continue
+
+            key = json.dumps(analytic_distribution, sort_keys=True)
+            liquidity_lines, _counterpart_lines, _writeoff_lines = payment._seek_for_lines()
+            for line in liquidity_lines:
+                if line.analytic_distribution != analytic_distribution:
+                    line_ids_by_distribution[key].append(line.id)
 
         # Update analytic distribution on bank lines
-        for line in self.move_id.line_ids:
-            if line.account_id in bank_accounts:
-                line.analytic_distribution = analytic_distribution
+        for distribution, line_ids in line_ids_by_distribution.items():
+            self.env['account.move.line'].browse(line_ids).write({
+                'analytic_distribution': json.loads(distribution),
+            })
 
     def action_post(self):
         """Override to ensure project_id and analytic distribution are set on the journal entry after posting."""
         res = super().action_post()
-        for payment in self:
-            if payment.move_id and payment.project_id:
-                payment.move_id.project_id = payment.project_id
-                payment._set_analytic_on_bank_lines()
+        self.filtered('project_id')._set_project_on_moves()
         return res
 
 
@@ -496,9 +825,14 @@ class AccountPaymentRegister(models.TransientModel):
     @api.depends('line_ids')
     def _compute_project_id(self):
         for wizard in self:
-            moves = wizard.line_ids.mapped('move_id')
-            projects = moves.mapped('project_id')
-            wizard.project_id = projects[0] if len(projects) == 1 else False
+            projects = wizard.line_ids.move_id.project_id
+            wizard.project_id = projects if len(projects) == 1 else False
+
+    def _create_payments(self):
+        # Read the project of all the paid entries at once, the batches then
+        # find it in cache
+        self.line_ids.move_id.mapped('project_id')
+        return super()._create_payments()
 
     def _create_payment_vals_from_wizard(self, batch_result):
         payment_vals = super()._create_payment_vals_from_wizard(batch_result)
@@ -510,9 +844,8 @@ class AccountPaymentRegister(models.TransientModel):
         payment_vals = super()._create_payment_vals_from_batch(batch_result)
         # Get project from the batch's invoices
         lines = batch_result.get('lines', self.env['account.move.line'])
-        moves = lines.mapped('move_id')
-        projects = moves.mapped('project_id')
-        if len(projects) == 1 and projects:
+        projects = lines.move_id.project_id
+        if len(projects) == 1:
             payment_vals['project_id'] = projects.id
         return payment_vals
 
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools.sql import SQL
+
+from .project import PROJECT_PLAN_ID, PROJECT_STAGE_PLAN_ID
+
+
+class ProjectFinancialReport(models.Model):
+    """Committed, actual and paid amounts of the projects.
+
+    One row per source document (confirmed purchase order, posted journal
+    entry, posted payment), project stage and month. The rows are stored in a
+    table refreshed by cron: only the documents written since the previous
+    refresh are computed again.
+
+    The petty cash expenses are included through the analytic distribution
+    of their journal entries.
+    """
+    _name = 'pct.project.financial.report'
+    _inherit = 'pct.project.report.mixin'
+    _description = 'Project Financial Analysis'
+    _auto = False
+    _order = 'date desc'
+
+    _refresh_date_param = 'pct_projects.financial_report_refresh_date'
+    _report_columns = {
+        'res_model': 'VARCHAR NOT NULL',
+        'res_id': 'INTEGER NOT NULL',
+        'project_id': 'INTEGER NOT NULL',
+        'stage_id': 'INTEGER',
+        'company_id': 'INTEGER',
+        'date': 'DATE',
+        'committed_amount': 'NUMERIC',
+        'actual_cost': 'NUMERIC',
+        'invoiced_amount': 'NUMERIC',
+        'paid_amount': 'NUMERIC',
+        'received_amount': 'NUMERIC',
+    }
+    _report_indexes = (('project_id', 'date'), ('date',), ('res_model', 'res_id'))
+    _report_res_model_column = 'res_model'
+
+    res_model = fields.Char(string='Source Model', readonly=True)
+    res_id = fields.Many2oneReference(string='Source Document', model_field='res_model', readonly=True)
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    stage_id = fields.Many2one('account.analytic.account', string='Project Stage', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date = fields.Date(string='Month', readonly=True)
+    committed_amount = fields.Float(string='Committed', readonly=True,
+                                    help="Untaxed amount of the confirmed purchase orders.")
+    actual_cost = fields.Float(string='Actual Cost', readonly=True,
+                               help="Vendor bills and other journal entries (like petty cash expenses).")
+    invoiced_amount = fields.Float(string='Invoiced', readonly=True,
+                                   help="Untaxed amount of the customer invoices.")
+    paid_amount = fields.Float(string='Paid', readonly=True)
+    received_amount = fields.Float(string='Received', readonly=True)
+
+    # -------------------------------------------------------------------------
+    # Query
+    # -------------------------------------------------------------------------
+    def _distribution(self, column):
+        """Lateral join splitting an analytic distribution column by key.
+
+        Gives the percentage, project analytic account and project stage of
+        every key, or a single row of NULL for lines without distribution.
+        """
+        return SQL(
+            """
+            LEFT JOIN LATERAL (
+                SELECT item.value::numeric AS percentage,
+                       MAX(aaa.id) FILTER (WHERE aaa.plan_id = %(project_plan)s) AS project_account_id,
+                       MAX(aaa.id) FILTER (WHERE aaa.plan_id = %(stage_plan)s) AS stage_id
+                  FROM jsonb_each_text(%(column)s) AS item
+                  LEFT JOIN account_analytic_account aaa
+                         ON aaa.id = ANY(string_to_array(item.key, ',')::integer[])
+                 GROUP BY item.key, item.value
+            ) dist ON TRUE
+            LEFT JOIN project_accounts ON project_accounts.account_id = dist.project_account_id
+            """,
+            project_plan=PROJECT_PLAN_ID,
+            stage_plan=PROJECT_STAGE_PLAN_ID,
+            column=SQL(column),
+        )
+
+    def _filter(self, column, ids):
+        """Restrict a source to some documents, all of them when ids is None."""
+        if ids is None:
+            return SQL()
+        return SQL("AND %s = ANY(%s)", SQL(column), list(ids))
+
+    def _select_purchase(self, ids=None):
+        return SQL(
+            """
+            SELECT 'purchase.order' AS res_model,
+                   po.id AS res_id,
+                   COALESCE(project_accounts.project_id, po.project_id) AS project_id,
+                   dist.stage_id AS stage_id,
+                   po.company_id AS company_id,
+                   date_trunc('month', po.date_approve)::date AS date,
+                   SUM(pol.price_subtotal / COALESCE(NULLIF(po.currency_rate, 0), 1)
+                       * COALESCE(dist.percentage, 100) / 100) AS committed_amount,
+                   0 AS actual_cost,
+                   0 AS invoiced_amount,
+                   0 AS paid_amount,
+                   0 AS received_amount
+              FROM purchase_order_line pol
+              JOIN purchase_order po ON po.id = pol.order_id
+              %(distribution)s
+             WHERE po.state IN ('purchase', 'done')
+               AND pol.display_type IS NULL
+               %(filter)s
+             GROUP BY 1, 2, 3, 4, 5, 6
+            """,
+            distribution=self._distribution('pol.analytic_distribution'),
+            filter=self._filter('po.id', ids),
+        )
+
+    def _select_move(self, ids=None):
+        return SQL(
+            """
+            SELECT 'account.move' AS res_model,
+                   move.id AS res_id,
+                   COALESCE(project_accounts.project_id, move.project_id) AS project_id,
+                   dist.stage_id AS stage_id,
+                   move.company_id AS company_id,
+                   date_trunc('month', move.date)::date AS date,
+                   0 AS committed_amount,
+                   SUM(CASE WHEN move.move_type IN ('out_invoice', 'out_refund') THEN 0
+                            ELSE aml.balance * COALESCE(dist.percentage, 100) / 100 END) AS actual_cost,
+                   SUM(CASE WHEN move.move_type IN ('out_invoice', 'out_refund')
+                            THEN -aml.balance * COALESCE(dist.percentage, 100) / 100
+                            ELSE 0 END) AS invoiced_amount,
+                   0 AS paid_amount,
+                   0 AS received_amount
+              FROM account_move_line aml
+              JOIN account_move move ON move.id = aml.move_id
+              %(distribution)s
+             WHERE move.state = 'posted'
+               -- Payments and bank statements are counted from the payments
+               AND move.origin_payment_id IS NULL
+               AND move.statement_line_id IS NULL
+               AND CASE WHEN move.move_type = 'entry' THEN aml.analytic_distribution IS NOT NULL
+                        ELSE aml.display_type = 'product' END
+               %(filter)s
+             GROUP BY 1, 2, 3, 4, 5, 6
+            """,
+            distribution=self._distribution('aml.analytic_distribution'),
+            filter=self._filter('move.id', ids),
+        )
+
+    def _select_payment(self, ids=None):
+        return SQL(
+            """
+            SELECT 'account.payment' AS res_model,
+                   pay.id AS res_id,
+                   pay.project_id AS project_id,
+                   NULL::integer AS stage_id,
+                   pay.company_id AS company_id,
+                   date_trunc('month', pay.date)::date AS date,
+                   0 AS committed_amount,
+                   0 AS actual_cost,
+                   0 AS invoiced_amount,
+                   CASE WHEN pay.payment_type = 'outbound' THEN -pay.amount_company_currency_signed
+                        ELSE 0 END AS paid_amount,
+                   CASE WHEN pay.payment_type = 'inbound' THEN pay.amount_company_currency_signed
+                        ELSE 0 END AS received_amount
+              FROM account_payment pay
+             WHERE pay.state IN ('in_process', 'paid')
+               %(filter)s
+            """,
+            filter=self._filter('pay.id', ids),
+        )
+
+    def _query(self, ids_by_model=None):
+        """Rows of all the documents, or of the documents given by model."""
+        ids_by_model = ids_by_model or {}
+        return SQL(
+            """
+            WITH project_accounts AS (
+                SELECT account_id, MIN(id) AS project_id
+                  FROM project_project
+                 WHERE account_id IS NOT NULL
+                 GROUP BY account_id
+            )
+            SELECT res_model, res_id, project_id, stage_id, company_id, date,
+                   committed_amount, actual_cost, invoiced_amount, paid_amount, received_amount
+              FROM (%s UNION ALL %s UNION ALL %s) AS source
+             WHERE project_id IS NOT NULL
+            """,
+            self._select_purchase(ids_by_model.get('purchase.order')),
+            self._select_move(ids_by_model.get('account.move')),
+            self._select_payment(ids_by_model.get('account.payment')),
+        )
+
+    # -------------------------------------------------------------------------
+    # Refresh
+    # -------------------------------------------------------------------------
+    @api.model
+    def _get_changed_ids(self, since):
+        queries = {
+            'purchase.order': """
+                SELECT id FROM purchase_order WHERE write_date >= %(since)s
+                UNION SELECT order_id FROM purchase_order_line WHERE write_date >= %(since)s
+            """,
+            'account.move': """
+                SELECT id FROM account_move WHERE write_date >= %(since)s
+                UNION SELECT move_id FROM account_move_line WHERE write_date >= %(since)s
+            """,
+            'account.payment': """
+                SELECT id FROM account_payment WHERE write_date >= %(since)s
+            """,
+        }
+        ids_by_model = {}
+        for model, query in queries.items():
+            self.env.cr.execute(SQL(query, since=since))
+            ids_by_model[model] = [res_id for res_id, in self.env.cr.fetchall()]
+        return ids_by_model
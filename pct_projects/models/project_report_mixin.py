@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools.sql import SQL, create_index
+
+# Documents written this long before the last refresh are refreshed again, so
+# that the transactions still running during the last refresh are not missed
+REFRESH_OVERLAP = timedelta(hours=1)
+
+
+class ProjectReportMixin(models.AbstractModel):
+    """Report stored in a table refreshed incrementally by cron.
+
+    The rows are computed per source document. Every refresh deletes and
+    computes again the rows of the documents written since the previous
+    refresh, and deletes the rows of the documents deleted since then.
+
+    The reports define:
+        - ``_refresh_date_param``: parameter holding the last refresh date
+        - ``_report_columns``: {column name: SQL type} of the table
+        - ``_report_indexes``: column names of the indexes of the table
+        - ``_report_res_model_column``: column of the model of the source
+          documents, when the rows come from several models
+        - ``_report_res_id_column``: column of the ID of the source documents
+        - ``_get_changed_ids``: documents written since a date
+        - ``_query``: rows of all the documents, or of the given ones
+    """
+    _name = 'pct.project.report.mixin'
+    _description = 'Incrementally Refreshed Project Report'
+
+    _refresh_date_param = None
+    _report_columns = {}
+    _report_indexes = ()
+    _report_res_model_column = None
+    _report_res_id_column = 'res_id'
+
+    def _get_table_definition(self):
+        """Column definitions of the table, kept in its comment to find out
+        when they changed."""
+        return ', '.join(f'{column} {column_type}' for column, column_type in self._report_columns.items())
+
+    def init(self):
+        if self._abstract:
+            return
+        cr = self.env.cr
+        table = SQL.identifier(self._table)
+        definition = self._get_table_definition()
+        cr.execute(SQL("SELECT obj_description(to_regclass(%s), 'pg_class')", self._table))
+        # The table is only rebuilt when it is new or its columns changed, the
+        # module updates keep the rows and let the cron refresh them
+        is_new = cr.fetchone()[0] != definition
+        if is_new:
+            cr.execute(SQL("DROP TABLE IF EXISTS %s", table))
+        cr.execute(SQL(
+            "CREATE TABLE IF NOT EXISTS %s (id SERIAL PRIMARY KEY, %s)",
+            table,
+            SQL(', ').join(
+                SQL("%s %s", SQL.identifier(column), SQL(column_type))
+                for column, column_type in self._report_columns.items()
+            ),
+        ))
+        for fnames in self._report_indexes:
+            create_index(cr, f"{self._table}_{'_'.join(fnames)}_index", self._table, list(fnames))
+        if is_new:
+            cr.execute(SQL("COMMENT ON TABLE %s IS %s", table, definition))
+            self._refresh_report(full=True)
+
+    @api.model
+    def _get_changed_ids(self, since):
+        """Source documents written since a date.
+
+        The deleted documents are not returned, see _refresh_report.
+
+        Returns:
+            Dict {model name: list of IDs}
+        """
+        raise NotImplementedError()
+
+    def _query(self, ids_by_model=None):
+        """Rows of all the documents, or of the documents given by model.
+
+        The columns are selected in the order of _report_columns.
+        """
+        raise NotImplementedError()
+
+    @api.model
+    def _refresh_report(self, full=False):
+        """Compute again the rows of the documents written since the last refresh.
+
+        All the rows are computed again on the first refresh, or when `full`
+        is set (e.g. after changing the analytic account of a project). The
+        rows of the documents deleted since the last refresh are removed.
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        table = SQL.identifier(self._table)
+        params = self.env['ir.config_parameter'].sudo()
+        cr.execute("SELECT now() AT TIME ZONE 'UTC'")
+        refresh_date = cr.fetchone()[0]
+        last_refresh = params.get_param(self._refresh_date_param)
+
+        if full or not last_refresh:
+            cr.execute(SQL("DELETE FROM %s", table))
+            ids_by_model = None
+        else:
+            since = fields.Datetime.to_datetime(last_refresh) - REFRESH_OVERLAP
+            ids_by_model = self._get_changed_ids(since)
+            res_id = SQL.identifier('report', self._report_res_id_column)
+            for model, ids in ids_by_model.items():
+                model_filter = SQL()
+                if self._report_res_model_column:
+                    model_filter = SQL(
+                        "%s = %s AND", SQL.identifier('report', self._report_res_model_column), model,
+                    )
+                cr.execute(SQL(
+                    """
+                    DELETE FROM %(table)s report
+                     WHERE %(model_filter)s
+                           (%(res_id)s = ANY(%(ids)s)
+                            OR NOT EXISTS (SELECT 1 FROM %(source)s source WHERE source.id = %(res_id)s))
+                    """,
+                    table=table,
+                    model_filter=model_filter,
+                    res_id=res_id,
+                    ids=ids,
+                    source=SQL.identifier(self.env[model]._table),
+                ))
+        if ids_by_model is None or any(ids_by_model.values()):
+            cr.execute(SQL(
+                "INSERT INTO %s (%s) %s",
+                table,
+                SQL(', ').join(SQL.identifier(column) for column in self._report_columns),
+                self._query(ids_by_model),
+            ))
+        params.set_param(self._refresh_date_param, fields.Datetime.to_string(refresh_date))
+        self.invalidate_model()
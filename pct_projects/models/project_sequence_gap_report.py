@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+from odoo.tools.sql import SQL, drop_view_if_exists
+
+# Number of digits of the date parts interpolated in the prefix and suffix of
+# the sequences (the range_ and current_ variants have the same width)
+SEQUENCE_DATE_PART_WIDTHS = {
+    'year': 4,
+    'month': 2,
+    'day': 2,
+    'y': 2,
+    'doy': 3,
+    'woy': 2,
+    'weekday': 1,
+    'h24': 2,
+    'h12': 2,
+    'min': 2,
+    'sec': 2,
+}
+
+
+class ProjectSequenceGapReport(models.Model):
+    """Holes in the numbering of the project invoices.
+
+    Standard sequences hand out their numbers outside of the transaction, so
+    the numbers reserved by an invoicing rolled back afterwards are never
+    used. One row per run of missing numbers between two invoices numbered
+    by the same sequence.
+
+    The number of an invoice is read between the prefix and the suffix of
+    the sequence, the date parts of the prefix (like the year and month)
+    being matched by their number of digits. The invoice numbers that do not
+    match the sequence of any project are ignored.
+    """
+    _name = 'pct.project.sequence.gap.report'
+    _description = 'Project Invoice Sequence Gaps'
+    _auto = False
+    _order = 'sequence_id, first_missing'
+
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    sequence_id = fields.Many2one('ir.sequence', string='Invoice Sequence', readonly=True)
+    first_missing = fields.Integer(string='First Missing Number', readonly=True)
+    last_missing = fields.Integer(string='Last Missing Number', readonly=True)
+    missing_count = fields.Integer(string='Missing Numbers', readonly=True)
+
+    def _affix_pattern(self, column):
+        """Regular expression matching the interpolated prefix or suffix in a column."""
+        # Escape the special characters of the regular expressions
+        pattern = SQL(
+            "regexp_replace(COALESCE(%s, ''), %s, %s, 'g')",
+            SQL(column), r'([.^$*+?()\[\]{}|\\])', r'\\\1',
+        )
+        # %(range_year)s, escaped above, becomes %year, then \d{4}
+        pattern = SQL(
+            "regexp_replace(%s, %s, %s, 'g')",
+            pattern, r'%\\\((?:range_end_|range_|current_)?(\w+)\\\)s', r'%\1',
+        )
+        for part, width in SEQUENCE_DATE_PART_WIDTHS.items():
+            pattern = SQL("replace(%s, %s, %s)", pattern, f'%{part}', rf'\d{{{width}}}')
+        return pattern
+
+    def init(self):
+        drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE VIEW %(table)s AS (
+                WITH sequences AS (
+                    SELECT seq.id AS sequence_id,
+                           seq.company_id,
+                           seq.number_increment,
+                           MIN(project.id) AS project_id,
+                           split_part(COALESCE(seq.prefix, ''), %(percent)s, 1) AS head,
+                           '^' || %(prefix)s || '(\\d+)' || %(suffix)s || '$' AS pattern
+                      FROM project_project project
+                      JOIN ir_sequence seq ON seq.id = project.invoice_sequence_id
+                     GROUP BY seq.id
+                ), numbers AS (
+                    SELECT DISTINCT sequences.sequence_id,
+                           substring(move.project_sequence_number FROM sequences.pattern)::integer AS number
+                      FROM account_move move
+                      JOIN sequences ON starts_with(move.project_sequence_number, sequences.head)
+                                    AND move.project_sequence_number ~ sequences.pattern
+                     WHERE move.project_sequence_number IS NOT NULL
+                ), steps AS (
+                    SELECT sequence_id,
+                           number,
+                           lag(number) OVER (PARTITION BY sequence_id ORDER BY number) AS previous_number
+                      FROM numbers
+                )
+                SELECT row_number() OVER (ORDER BY steps.sequence_id, steps.number) AS id,
+                       sequences.project_id,
+                       sequences.company_id,
+                       steps.sequence_id,
+                       steps.previous_number + sequences.number_increment AS first_missing,
+                       steps.number - sequences.number_increment AS last_missing,
+                       (steps.number - steps.previous_number) / sequences.number_increment - 1 AS missing_count
+                  FROM steps
+                  JOIN sequences ON sequences.sequence_id = steps.sequence_id
+                 WHERE steps.number - steps.previous_number > sequences.number_increment
+            )
+            """,
+            table=SQL.identifier(self._table),
+            percent='%',
+            prefix=self._affix_pattern('seq.prefix'),
+            suffix=self._affix_pattern('seq.suffix'),
+        ))
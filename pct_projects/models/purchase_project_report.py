@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools.sql import SQL, create_index
+
+
+class PurchaseProjectReport(models.Model):
+    """Monthly purchase totals per project, vendor and product category.
+
+    The totals are pre-aggregated per confirmed purchase order and stored in a
+    table refreshed by cron from the ``write_date`` of the order lines, so the
+    dashboards do not group the whole ``purchase.report`` view again.
+    """
+    _name = 'purchase.project.report'
+    _inherit = 'pct.project.report.mixin'
+    _description = 'Purchase Analysis by Project'
+    _auto = False
+    _order = 'date desc'
+
+    _refresh_date_param = 'pct_projects.purchase_project_report_refresh_date'
+    _report_columns = {
+        'order_id': 'INTEGER NOT NULL',
+        'project_id': 'INTEGER NOT NULL',
+        'partner_id': 'INTEGER',
+        'categ_id': 'INTEGER',
+        'company_id': 'INTEGER',
+        'date': 'DATE',
+        'line_count': 'INTEGER',
+        'untaxed_amount': 'NUMERIC',
+        'received_amount': 'NUMERIC',
+        'billed_amount': 'NUMERIC',
+    }
+    _report_indexes = (('project_id', 'date'), ('partner_id',), ('categ_id',), ('order_id',))
+    _report_res_id_column = 'order_id'
+
+    order_id = fields.Many2one('purchase.order', string='Purchase Order', readonly=True)
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Vendor', readonly=True)
+    categ_id = fields.Many2one('product.category', string='Product Category', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date = fields.Date(string='Month', readonly=True)
+    line_count = fields.Integer(string='# of Lines', readonly=True)
+    untaxed_amount = fields.Float(string='Untaxed Total', readonly=True)
+    received_amount = fields.Float(string='Received Amount', readonly=True)
+    billed_amount = fields.Float(string='Billed Amount', readonly=True)
+
+    def _query(self, ids_by_model=None):
+        """Totals of all the confirmed orders, or of the given orders."""
+        order_ids = ids_by_model['purchase.order'] if ids_by_model is not None else None
+        return SQL(
+            """
+            SELECT po.id AS order_id,
+                   po.project_id AS project_id,
+                   po.partner_id AS partner_id,
+                   pt.categ_id AS categ_id,
+                   po.company_id AS company_id,
+                   date_trunc('month', po.date_approve)::date AS date,
+                   COUNT(pol.id) AS line_count,
+                   SUM(pol.price_subtotal / %(rate)s) AS untaxed_amount,
+                   SUM(pol.price_subtotal / %(rate)s * pol.qty_received / NULLIF(pol.product_qty, 0)) AS received_amount,
+                   SUM(pol.price_subtotal / %(rate)s * pol.qty_invoiced / NULLIF(pol.product_qty, 0)) AS billed_amount
+              FROM purchase_order_line pol
+              JOIN purchase_order po ON po.id = pol.order_id
+              LEFT JOIN product_product pp ON pp.id = pol.product_id
+              LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+             WHERE po.state IN ('purchase', 'done')
+               AND po.project_id IS NOT NULL
+               AND pol.display_type IS NULL
+               %(filter)s
+             GROUP BY po.id, pt.categ_id
+            """,
+            rate=SQL("COALESCE(NULLIF(po.currency_rate, 0), 1)"),
+            filter=SQL("AND po.id = ANY(%s)", order_ids) if order_ids is not None else SQL(),
+        )
+
+    def init(self):
+        # Changed order lines are looked up by write date at every refresh
+        create_index(self.env.cr, 'purchase_order_line_write_date_index', 'purchase_order_line', ['write_date'])
+        super().init()
+
+    @api.model
+    def _get_changed_ids(self, since):
+        self.env.cr.execute(SQL(
+            """
+            SELECT order_id FROM purchase_order_line WHERE write_date >= %(since)s
+            UNION SELECT id FROM purchase_order WHERE write_date >= %(since)s
+            """,
+            since=since,
+        ))
+        return {'purchase.order': [order_id for order_id, in self.env.cr.fetchall()]}
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+from . import test_project_invoice_sequence
+from . import test_account_move_analytic
+from . import test_project_financial_report
+from . import test_account_payment
+from . import test_account_move_project
+from . import test_purchase_project_report
+from . import test_project_reassign_wizard
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+
+class ProjectReportTestMixin:
+    """Refresh tests shared by the incrementally refreshed project reports.
+
+    The test classes set ``report_model`` and ``project``, and create a
+    confirmed or posted source document of the project with
+    ``_create_document``.
+    """
+    report_model = None
+
+    def _get_rows(self):
+        return self.env[self.report_model].search([('project_id', '=', self.project.id)])
+
+    def _refresh(self, full=False):
+        self.env[self.report_model]._refresh_report(full=full)
+
+    def _create_document(self):
+        raise NotImplementedError()
+
+    def _delete_document(self, document):
+        raise NotImplementedError()
+
+    def test_refresh_twice(self):
+        self._refresh()
+        self.assertFalse(self._get_rows())
+        self._create_document()
+        self._refresh()
+        rows = self._get_rows()
+        self.assertTrue(rows)
+        # Refreshing the same documents again does not duplicate their rows
+        self._refresh()
+        self.assertEqual(len(self._get_rows()), len(rows))
+        self._refresh(full=True)
+        self.assertEqual(len(self._get_rows()), len(rows))
+
+    def test_refresh_deleted_document(self):
+        document = self._create_document()
+        self._refresh()
+        self.assertTrue(self._get_rows())
+        # Reset and deleted between two refreshes
+        self._delete_document(document)
+        self._refresh()
+        self.assertFalse(self._get_rows())
+
+    def test_init_keeps_rows(self):
+        self._create_document()
+        self._refresh()
+        rows = self._get_rows()
+        # Updating the module does not rebuild the table
+        Report = self.env.registry[self.report_model]
+        with patch.object(Report, '_refresh_report', autospec=True) as refresh:
+            self.env[self.report_model].init()
+        refresh.assert_not_called()
+        self.assertEqual(self._get_rows(), rows)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestAccountMoveAnalytic(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Analytic Project'})
+
+    def _create_bill(self, line_names):
+        return self.env['account.move'].create({
+            'move_type': 'in_invoice',
+            'partner_id': self.partner_a.id,
+            'project_id': self.project.id,
+            'invoice_date': '2025-01-01',
+            'invoice_line_ids': [(0, 0, {
+                'name': name,
+                'product_id': self.product_a.id,
+                'quantity': 1,
+                'price_unit': 10,
+            }) for name in line_names],
+        })
+
+    def test_post_reports_all_lines(self):
+        bills = self._create_bill(['Line A1', 'Line A2']) | self._create_bill(['Line B1'])
+        with self.assertRaises(ValidationError) as error:
+            bills.action_post()
+        message = str(error.exception)
+        for name in ('Line A1', 'Line A2', 'Line B1'):
+            self.assertIn(name, message)
+        self.assertEqual(set(bills.mapped('state')), {'draft'})
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import new_test_user, tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestAccountMoveProject(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.customer = cls.env['res.partner'].create({'name': 'Project Customer'})
+        cls.project = cls.env['project.project'].create({
+            'name': 'Customer Project',
+            'partner_id': cls.customer.id,
+        })
+
+    def test_create_invoices_project_from_partner(self):
+        invoices = self.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'partner_id': self.customer.id,
+        } for _i in range(3)])
+        self.assertEqual(invoices.project_id, self.project)
+
+        # Invoices with a project are left as is
+        other_project = self.env['project.project'].create({'name': 'Other Project'})
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.customer.id,
+            'project_id': other_project.id,
+        })
+        self.assertEqual(invoice.project_id, other_project)
+
+    def test_create_bill_without_project_from_partner(self):
+        # The project of the customer is not set on vendor bills
+        vals = {'move_type': 'in_invoice', 'partner_id': self.customer.id}
+        self.env['account.move']._set_project_from_partner([vals])
+        self.assertNotIn('project_id', vals)
+
+    def test_project_from_partner_access(self):
+        user = new_test_user(self.env, login='pct_project_user', groups='base.group_user,project.group_project_user')
+        self.env['project.project'].create({
+            'name': 'Private Project',
+            'partner_id': self.customer.id,
+            'privacy_visibility': 'followers',
+        })
+        Project = self.env['project.project']
+        self.assertEqual(Project._get_single_project_by_partner(self.customer.ids), {})
+        # The project the user cannot read is not counted
+        self.assertEqual(
+            Project.with_user(user)._get_single_project_by_partner(self.customer.ids),
+            {self.customer.id: self.project.id},
+        )
+
+    def test_project_map_invalidation(self):
+        Project = self.env['project.project']
+        self.assertEqual(
+            Project._get_single_project_by_partner(self.customer.ids),
+            {self.customer.id: self.project.id},
+        )
+        second_project = Project.create({'name': 'Second Project', 'partner_id': self.customer.id})
+        self.assertEqual(Project._get_single_project_by_partner(self.customer.ids), {})
+        self.project.active = False
+        self.assertEqual(
+            Project._get_single_project_by_partner(self.customer.ids),
+            {self.customer.id: second_project.id},
+        )
+
+    def test_write_origin_keeps_project(self):
+        other_project = self.env['project.project'].create({'name': 'Order Project'})
+        order = self.env['purchase.order'].create({
+            'partner_id': self.partner_a.id,
+            'project_id': other_project.id,
+        })
+        bill = self.env['account.move'].create({
+            'move_type': 'in_invoice',
+            'partner_id': self.partner_a.id,
+            'project_id': self.project.id,
+        })
+        # The project of the order is only used by the moves without project
+        bill.write({'invoice_origin': order.name})
+        self.assertEqual(bill.project_id, self.project)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from ..models.project import PROJECT_PLAN_ID
+
+
+@tagged('post_install', '-at_install')
+class TestAccountPayment(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.analytic_accounts = cls.env['account.analytic.account'].create([
+            {'name': 'Payment Project 1', 'plan_id': PROJECT_PLAN_ID},
+            {'name': 'Payment Project 2', 'plan_id': PROJECT_PLAN_ID},
+        ])
+        cls.projects = cls.env['project.project'].create([
+            {'name': 'Payment Project 1', 'account_id': cls.analytic_accounts[0].id},
+            {'name': 'Payment Project 2', 'account_id': cls.analytic_accounts[1].id},
+        ])
+
+    def _assert_bank_line_analytic(self, payment):
+        liquidity_lines = payment._seek_for_lines()[0]
+        self.assertTrue(liquidity_lines)
+        for line in liquidity_lines:
+            self.assertEqual(line.analytic_distribution, {str(payment.project_id.account_id.id): 100})
+
+    def test_post_payments_projects(self):
+        payments = self.env['account.payment'].create([{
+            'payment_type': 'outbound',
+            'partner_type': 'supplier',
+            'partner_id': self.partner_a.id,
+            'amount': 100.0,
+            'journal_id': self.company_data['default_journal_bank'].id,
+            'project_id': project.id,
+        } for project in [self.projects[0], self.projects[1], self.projects[0]]])
+        payments.action_post()
+        for payment in payments:
+            self.assertEqual(payment.move_id.project_id, payment.project_id)
+            self._assert_bank_line_analytic(payment)
+
+        # Changing the project of a payment updates its journal entry
+        payments[0].project_id = self.projects[1]
+        self.assertEqual(payments[0].move_id.project_id, self.projects[1])
+        self._assert_bank_line_analytic(payments[0])
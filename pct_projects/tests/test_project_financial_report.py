@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from .common import ProjectReportTestMixin
+
+
+@tagged('post_install', '-at_install')
+class TestProjectFinancialReport(ProjectReportTestMixin, AccountTestInvoicingCommon):
+    report_model = 'pct.project.financial.report'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Financial Project'})
+
+    def _create_document(self):
+        payment = self.env['account.payment'].create({
+            'payment_type': 'outbound',
+            'partner_type': 'supplier',
+            'partner_id': self.partner_a.id,
+            'amount': 150.0,
+            'journal_id': self.company_data['default_journal_bank'].id,
+            'project_id': self.project.id,
+        })
+        payment.action_post()
+        return payment
+
+    def _delete_document(self, document):
+        document.action_draft()
+        document.unlink()
+
+    def test_incremental_refresh(self):
+        self._refresh()
+        self.assertFalse(self._get_rows())
+
+        payment = self._create_document()
+        self._refresh()
+        rows = self._get_rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows.res_model, rows.res_id), ('account.payment', payment.id))
+        self.assertAlmostEqual(rows.paid_amount, 150.0)
+        self.assertEqual(rows.date, payment.date.replace(day=1))
+
+        payment.action_draft()
+        payment.action_cancel()
+        self._refresh()
+        self.assertFalse(self._get_rows())
+
+        payment.action_draft()
+        payment.action_post()
+        self._refresh(full=True)
+        self.assertAlmostEqual(sum(self._get_rows().mapped('paid_amount')), 150.0)
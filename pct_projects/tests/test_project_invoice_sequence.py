@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import psycopg2
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.tests import BaseCase, tagged
+from odoo.tests.common import get_db_name
+from odoo.tools import mute_logger
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@contextmanager
+def environment():
+    """Environment on a new cursor, committed when leaving the block."""
+    registry = Registry(get_db_name())
+    with registry.cursor() as cr:
+        yield api.Environment(cr, SUPERUSER_ID, {})
+
+
+@tagged('post_install', '-at_install')
+class TestProjectInvoiceSequence(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({
+            'name': 'Sequence Project',
+            'prefix': 'TSQ',
+        })
+        cls.sequence = cls.project.invoice_sequence_id
+
+    def _create_invoices(self, count, move_type='out_invoice'):
+        return self.env['account.move'].create([{
+            'move_type': move_type,
+            'partner_id': self.partner_a.id,
+            'project_id': self.project.id,
+        } for _i in range(count)])
+
+    def _get_numbers(self, moves):
+        return [int(move.project_sequence_number.rsplit('/', 1)[1]) for move in moves]
+
+    def test_batch_allocation(self):
+        IrSequence = self.env.registry['ir.sequence']
+        with patch.object(
+            IrSequence, '_next_block', autospec=True, side_effect=IrSequence._next_block
+        ) as next_block:
+            invoices = self._create_invoices(3)
+            bills = self._create_invoices(2, move_type='in_invoice')
+        self.assertEqual(next_block.call_count, 1)
+        self.assertEqual(self._get_numbers(invoices), [1, 2, 3])
+        self.assertEqual(invoices[0].project_sequence_number, self.sequence.get_next_char(1))
+        self.assertFalse(any(bills.mapped('project_sequence_number')))
+
+        # Numbers are kept when the project is written again
+        invoices.write({'project_id': self.project.id})
+        self.assertEqual(self._get_numbers(invoices), [1, 2, 3])
+
+    def test_bulk_sequence_provisioning(self):
+        IrSequence = self.env.registry['ir.sequence']
+        existing = self.env['ir.sequence'].create({
+            'name': 'Existing Project Sequence',
+            'code': 'pct.project.invoice.TSQB1',
+        })
+        Project = self.env.registry['project.project']
+        with patch.object(
+            IrSequence, 'create', autospec=True, side_effect=IrSequence.create
+        ) as sequence_create, patch.object(
+            Project, 'write', autospec=True, side_effect=Project.write
+        ) as project_write:
+            projects = self.env['project.project'].create([
+                {'name': f'Bulk Project {prefix}', 'prefix': prefix}
+                for prefix in ('TSQB1', 'TSQB2', 'TSQB3')
+            ] + [{'name': 'Bulk Project Without Prefix'}])
+        self.assertEqual(sequence_create.call_count, 1)
+        # The sequences are given to the projects at creation
+        self.assertFalse([call for call in project_write.call_args_list if 'invoice_sequence_id' in call.args[1]])
+        self.assertEqual(projects[0].invoice_sequence_id, existing)
+        self.assertEqual(
+            projects[1:3].invoice_sequence_id.mapped('code'),
+            ['pct.project.invoice.TSQB2', 'pct.project.invoice.TSQB3'],
+        )
+        self.assertFalse(projects[3].invoice_sequence_id)
+
+        projects[3].prefix = 'TSQB4'
+        self.assertEqual(projects[3].invoice_sequence_id.code, 'pct.project.invoice.TSQB4')
+
+    def test_no_gap_block_pending_write(self):
+        sequence = self.env['ir.sequence'].create({
+            'name': 'Test Project No Gap',
+            'prefix': 'TNG/',
+            'padding': 3,
+            'implementation': 'no_gap',
+        })
+        sequence._next_block(2)
+        # "Next Number" reset in the same transaction, not flushed yet
+        sequence.number_next = 10
+        self.assertEqual(sequence._next_block(2), ['TNG/010', 'TNG/011'])
+        self.assertEqual(sequence.number_next, 12)
+
+    def test_gap_report(self):
+        self._create_invoices(3)
+        # Numbers reserved by an invoicing rolled back afterwards
+        self.sequence._next_block(2)
+        invoice = self._create_invoices(1)
+        self.assertEqual(self._get_numbers(invoice), [6])
+        self.env.flush_all()
+        gaps = self.env['pct.project.sequence.gap.report'].search([
+            ('project_id', '=', self.project.id),
+        ])
+        self.assertEqual(len(gaps), 1)
+        self.assertEqual(gaps.sequence_id, self.sequence)
+        self.assertEqual((gaps.first_missing, gaps.last_missing, gaps.missing_count), (4, 5, 2))
+
+    def test_gap_report_numbers(self):
+        invoices = self._create_invoices(3)
+        self.assertEqual(self._get_numbers(invoices), [1, 2, 3])
+        # The numbers keep increasing when the month of the prefix changes, and
+        # the numbers not given by the sequence are ignored
+        head = invoices[0].project_sequence_number.rsplit('/', 3)[0]
+        invoices[1].project_sequence_number = f'{head}/2024/12/00007'
+        invoices[2].project_sequence_number = 'TSQ-IMPORT-00012'
+        self.env.flush_all()
+        gaps = self.env['pct.project.sequence.gap.report'].search([
+            ('sequence_id', '=', self.sequence.id),
+        ])
+        self.assertEqual(
+            [(gap.first_missing, gap.last_missing, gap.missing_count) for gap in gaps],
+            [(2, 6, 5)],
+        )
+        self.assertEqual(gaps.project_id, self.project)
+
+
+@tagged('post_install', '-at_install')
+class TestProjectInvoiceSequenceConcurrency(BaseCase):
+    """Allocation from concurrent transactions, on committed sequences.
+
+    The sequences are committed, and deleted again by a cleanup registered
+    as soon as they are created.
+    """
+
+    def _create_sequence(self, implementation):
+        with environment() as env:
+            sequence_id = env['ir.sequence'].create({
+                'name': f'Test Project Block {implementation}',
+                'prefix': 'TBK/',
+                'padding': 3,
+                'implementation': implementation,
+            }).id
+        self.addCleanup(self._unlink_sequence, sequence_id)
+        return sequence_id
+
+    def _unlink_sequence(self, sequence_id):
+        with environment() as env:
+            env['ir.sequence'].browse(sequence_id).unlink()
+
+    def test_standard_block_concurrent(self):
+        sequence_id = self._create_sequence('standard')
+        with environment() as env1, environment() as env2:
+            sequence1 = env1['ir.sequence'].browse(sequence_id)
+            sequence2 = env2['ir.sequence'].browse(sequence_id)
+            first = sequence1._next_block(3)
+            second = sequence2._next_block(3)
+            third = sequence1._next_block(2)
+            env1.cr.rollback()
+        # No number is handed out twice, the blocks are increasing
+        self.assertEqual(first, sorted(first))
+        self.assertEqual(second, sorted(second))
+        self.assertEqual(len(set(first + second + third)), 8)
+        self.assertEqual(sorted(first + second + third), [f'TBK/{n:03d}' for n in range(1, 9)])
+        # The numbers of the rolled back transaction are not given again
+        with environment() as env:
+            self.assertEqual(env['ir.sequence'].browse(sequence_id)._next_block(1), ['TBK/009'])
+
+    @mute_logger('odoo.sql_db')
+    def test_no_gap_block_concurrent(self):
+        sequence_id = self._create_sequence('no_gap')
+        with environment() as env1:
+            self.assertEqual(
+                env1['ir.sequence'].browse(sequence_id)._next_block(3),
+                ['TBK/001', 'TBK/002', 'TBK/003'],
+            )
+            with environment() as env2:
+                with self.assertRaises(psycopg2.errors.LockNotAvailable):
+                    env2['ir.sequence'].browse(sequence_id)._next_block(2)
+                env2.cr.rollback()
+        with environment() as env:
+            self.assertEqual(env['ir.sequence'].browse(sequence_id)._next_block(2), ['TBK/004', 'TBK/005'])
+            env.cr.rollback()
+        # Rolled back numbers are handed out again, no gap is left
+        with environment() as env:
+            self.assertEqual(env['ir.sequence'].browse(sequence_id)._next_block(2), ['TBK/004', 'TBK/005'])
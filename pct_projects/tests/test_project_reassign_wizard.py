@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from ..models.project import PROJECT_PLAN_ID
+
+
+@tagged('post_install', '-at_install')
+class TestProjectReassignWizard(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Account = cls.env['account.analytic.account']
+        project_plan = cls.env['account.analytic.plan'].browse(PROJECT_PLAN_ID)
+        stage_plan = cls.env['account.analytic.plan'].create({'name': 'Reassign Stages'})
+        cls.old_account, cls.new_account = Account.create([
+            {'name': 'Reassign Old Project', 'plan_id': project_plan.id},
+            {'name': 'Reassign New Project', 'plan_id': project_plan.id},
+        ])
+        cls.stage = Account.create({'name': 'Reassign Stage', 'plan_id': stage_plan.id})
+        cls.new_project = cls.env['project.project'].create({
+            'name': 'Reassign New Project',
+            'account_id': cls.new_account.id,
+        })
+
+    def _create_bill(self, distributions):
+        return self.env['account.move'].create({
+            'move_type': 'in_invoice',
+            'partner_id': self.partner_a.id,
+            'invoice_date': '2025-01-01',
+            'invoice_line_ids': [(0, 0, {
+                'name': f'Reassign Line {index}',
+                'product_id': self.product_a.id,
+                'quantity': 1,
+                'price_unit': 10,
+                'analytic_distribution': distribution,
+            }) for index, distribution in enumerate(distributions)],
+        })
+
+    def _run_wizard(self, lines):
+        wizard = self.env['pct.project.reassign.wizard'].with_context(
+            active_model=lines._name, active_ids=lines.ids,
+        ).create({'project_id': self.new_project.id})
+        wizard.action_reassign_project()
+
+    def test_reassign_move_lines(self):
+        bill = self._create_bill([
+            {f'{self.old_account.id},{self.stage.id}': 100},
+            {str(self.old_account.id): 100},
+        ])
+        self.assertTrue(bill.line_ids.filtered(lambda l: l.display_type == 'tax'))
+        self._run_wizard(bill.line_ids)
+        self.assertEqual(bill.invoice_line_ids.mapped('analytic_distribution'), [
+            {str(self.stage.id): 100, str(self.new_account.id): 100},
+            {str(self.new_account.id): 100},
+        ])
+        # Only the product lines are moved to the project
+        other_lines = bill.line_ids.filtered(lambda l: l.display_type != 'product')
+        self.assertFalse(any(other_lines.mapped('analytic_distribution')))
+
+    def test_reassign_without_lines(self):
+        with self.assertRaises(UserError):
+            self._run_wizard(self.env['account.move.line'])
+
+    def test_replace_project_analytic(self):
+        lines = self._create_bill([
+            {str(self.old_account.id): 100},
+            {str(self.old_account.id): 100},
+            {f'{self.old_account.id},{self.stage.id}': 100},
+            {str(self.new_account.id): 100},
+        ]).invoice_line_ids
+        AccountMoveLine = self.env.registry['account.move.line']
+        with patch.object(
+            AccountMoveLine, 'write', autospec=True, side_effect=AccountMoveLine.write
+        ) as write:
+            lines._replace_project_analytic(self.new_account.id)
+        # One write per distinct distribution, none for the lines left as is
+        written = [call.args[0] for call in write.call_args_list if 'analytic_distribution' in call.args[1]]
+        self.assertEqual(sorted(len(records) for records in written), [1, 2])
+        self.assertEqual(lines.mapped('analytic_distribution'), [
+            {str(self.new_account.id): 100},
+            {str(self.new_account.id): 100},
+            {str(self.stage.id): 100, str(self.new_account.id): 100},
+            {str(self.new_account.id): 100},
+        ])
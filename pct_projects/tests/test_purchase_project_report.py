@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from .common import ProjectReportTestMixin
+
+
+@tagged('post_install', '-at_install')
+class TestPurchaseProjectReport(ProjectReportTestMixin, TransactionCase):
+    report_model = 'purchase.project.report'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Purchase Report Project'})
+        cls.vendor = cls.env['res.partner'].create({'name': 'Purchase Report Vendor'})
+        cls.product = cls.env['product.product'].create({'name': 'Purchase Report Product'})
+        cls.order = cls.env['purchase.order'].create({
+            'partner_id': cls.vendor.id,
+            'project_id': cls.project.id,
+            'order_line': [(0, 0, {
+                'product_id': cls.product.id,
+                'product_qty': 4,
+                'price_unit': 25,
+            })],
+        })
+
+    def _create_document(self):
+        order = self.order.copy()
+        # Confirmed without the analytic checks of button_confirm
+        order.write({'state': 'purchase', 'date_approve': fields.Datetime.now()})
+        return order
+
+    def _delete_document(self, document):
+        document.button_cancel()
+        document.unlink()
+
+    def test_incremental_refresh(self):
+        self._refresh()
+        self.assertFalse(self._get_rows())
+
+        # Confirmed without the analytic checks of button_confirm
+        self.order.write({'state': 'purchase', 'date_approve': fields.Datetime.now()})
+        self._refresh()
+        rows = self._get_rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows.order_id, self.order)
+        self.assertEqual(rows.partner_id, self.vendor)
+        self.assertEqual(rows.categ_id, self.product.categ_id)
+        self.assertAlmostEqual(rows.untaxed_amount, 100.0)
+
+        self.order.order_line.price_unit = 30
+        self._refresh()
+        self.assertAlmostEqual(sum(self._get_rows().mapped('untaxed_amount')), 120.0)
+
+        self.order.button_cancel()
+        self._refresh()
+        self.assertFalse(self._get_rows())
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class PctProjectReassignWizard(models.TransientModel):
+    _name = 'pct.project.reassign.wizard'
+    _description = 'Move Lines to Another Project'
+
+    project_id = fields.Many2one(
+        'project.project',
+        string='New Project',
+        required=True,
+        domain="[('account_id', '!=', False)]",
+    )
+    res_model = fields.Char(string='Model', readonly=True)
+    res_ids = fields.Json(string='Records', readonly=True)
+    line_count = fields.Integer(string='Lines', compute='_compute_line_count')
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        res['res_model'] = self.env.context.get('active_model')
+        res['res_ids'] = self.env.context.get('active_ids') or []
+        return res
+
+    @api.depends('res_ids')
+    def _compute_line_count(self):
+        for wizard in self:
+            wizard.line_count = len(wizard.res_ids or [])
+
+    def _get_lines(self):
+        """Return the selected lines that carry an analytic distribution."""
+        self.ensure_one()
+        if not self.res_model or not self.res_ids:
+            raise UserError(_("Select the lines to move to another project."))
+        if 'analytic_distribution' not in self.env[self.res_model]._fields:
+            raise UserError(_("The selected records have no analytic distribution."))
+        lines = self.env[self.res_model].browse(self.res_ids).exists()
+        if lines._name == 'account.move.line':
+            # Tax, payment term and balance lines do not carry the project
+            lines = lines.filtered(lambda l: l.display_type == 'product')
+        elif 'display_type' in lines._fields:
+            lines = lines.filtered(lambda l: l.display_type not in ('line_section', 'line_note'))
+        return lines
+
+    def action_reassign_project(self):
+        """Replace the project analytic account on all the selected lines."""
+        self.ensure_one()
+        if not self.project_id.account_id:
+            raise UserError(_("The project %s has no analytic account.") % self.project_id.display_name)
+        self._get_lines()._replace_project_analytic(self.project_id.account_id.id)
+        return {'type': 'ir.actions.act_window_close'}
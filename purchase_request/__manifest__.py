@@ -4,7 +4,7 @@
 {
     "name": "Purchase Request",
     "author": "ForgeFlow, Odoo Community Association (OCA)",
-    "version": "18.0.2.5.0",
+    "version": "18.0.2.7.0",
     "summary": "Use this module to have notification of requirements of "
     "materials and/or external services and keep track of such "
     "requirements.",
@@ -17,6 +17,7 @@
         "data/purchase_request_sequence.xml",
         "data/purchase_request_data.xml",
         "data/mail_template_data.xml",
+        "data/ir_cron_data.xml",
         "reports/report_purchase_request.xml",
         "reports/report_purchase_order.xml",
         "wizard/purchase_request_line_make_purchase_order_view.xml",
@@ -27,6 +28,7 @@
         "views/purchase_request_view.xml",
         "views/purchase_request_line_view.xml",
         "views/purchase_request_report.xml",
+        "views/purchase_request_report_views.xml",
         "views/product_template.xml",
         "views/purchase_order_view.xml",
         "views/stock_move_views.xml",
@@ -0,0 +1,29 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+from openupgradelib import openupgrade
+
+_CHUNK_SIZE = 1000
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    """Recompute the technical description previews with the new conversion.
+
+    The lines are processed by chunks so that large tables are not loaded in
+    memory at once.
+    """
+    env.cr.execute(
+        """
+        SELECT id
+        FROM purchase_request_line
+        WHERE technical_description IS NOT NULL
+        ORDER BY id
+        """
+    )
+    line_ids = [row[0] for row in env.cr.fetchall()]
+    lines_model = env["purchase.request.line"]
+    field = lines_model._fields["technical_description_text"]
+    for index in range(0, len(line_ids), _CHUNK_SIZE):
+        lines = lines_model.browse(line_ids[index : index + _CHUNK_SIZE])
+        env.add_to_compute(field, lines)
+        lines.flush_recordset(["technical_description_text"])
+        env.invalidate_all()
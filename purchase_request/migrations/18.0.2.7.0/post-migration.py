@@ -0,0 +1,13 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+from openupgradelib import openupgrade
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    """Remove the per-transfer storekeeper template, replaced by the digest.
+
+    The record is noupdate, so updating the module does not delete it.
+    """
+    openupgrade.delete_records_safely_by_xml_id(
+        env, ["purchase_request.email_template_stock_transfer_notification"]
+    )
@@ -10,5 +10,7 @@ from . import purchase_order
 from . import stock_move
 from . import stock_move_line
 from . import stock_picking
+from . import stock_picking_type
 from . import stock_warehouse
 from . import res_config_settings
+from . import purchase_request_report
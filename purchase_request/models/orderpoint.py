@@ -7,20 +7,28 @@ from odoo import models
 class Orderpoint(models.Model):
     _inherit = "stock.warehouse.orderpoint"
 
+    def _get_purchase_request_line_in_progress_domain(self):
+        return [
+            (
+                "request_id.state",
+                "in",
+                ("draft", "approved", "to_approve", "in_progress"),
+            ),
+            ("orderpoint_id", "in", self.ids),
+            ("purchase_state", "=", False),
+        ]
+
     def _quantity_in_progress(self):
         res = super()._quantity_in_progress()
-        for prline in self.env["purchase.request.line"].search(
-            [
-                (
-                    "request_id.state",
-                    "in",
-                    ("draft", "approved", "to_approve", "in_progress"),
-                ),
-                ("orderpoint_id", "in", self.ids),
-                ("purchase_state", "=", False),
-            ]
-        ):
-            res[prline.orderpoint_id.id] += prline.product_uom_id._compute_quantity(
-                prline.product_qty, prline.orderpoint_id.product_uom, round=False
+        # Sum the request quantities per orderpoint and UoM in SQL, so the
+        # UoM conversion is done once per group instead of once per line.
+        groups = self.env["purchase.request.line"]._read_group(
+            self._get_purchase_request_line_in_progress_domain(),
+            groupby=["orderpoint_id", "product_uom_id"],
+            aggregates=["product_qty:sum"],
+        )
+        for orderpoint, product_uom, product_qty in groups:
+            res[orderpoint.id] += product_uom._compute_quantity(
+                product_qty, orderpoint.product_uom, round=False
             )
         return res
@@ -22,21 +22,12 @@ class PurchaseOrder(models.Model):
     def _onchange_project_id_picking_type_sync(self):
         """Sync picking_type_id and analytic distribution based on project when project_id changes."""
         if self.project_id:
-            # Find warehouse linked to this project
-            warehouse = self.env["stock.warehouse"].search(
-                [("project_id", "=", self.project_id.id)], limit=1
-            )
-            if warehouse:
-                # Find incoming picking type for this warehouse
-                picking_type = self.env["stock.picking.type"].search(
-                    [
-                        ("code", "=", "incoming"),
-                        ("warehouse_id", "=", warehouse.id),
-                    ],
-                    limit=1,
-                )
-                if picking_type:
-                    self.picking_type_id = picking_type
+            # Find the incoming picking type of the warehouse linked to this project
+            picking_type, _int_type = self.env[
+                "stock.warehouse"
+            ]._get_project_picking_types(self.project_id)
+            if picking_type:
+                self.picking_type_id = picking_type
             # Set analytic distribution on order lines from project's analytic account
             if self.project_id.account_id:
                 analytic_account = self.project_id.account_id
@@ -173,30 +164,49 @@ class PurchaseOrderLine(models.Model):
             "domain": domain,
         }
 
+    def _get_purchase_request_allocations_by_line(self, domain=None):
+        """Read the allocations of all the lines at once.
+
+        :return: dict {purchase.order.line id: purchase.request.allocation}
+        """
+        groups = self.env["purchase.request.allocation"]._read_group(
+            [("purchase_line_id", "in", self.ids)] + (domain or []),
+            groupby=["purchase_line_id"],
+            aggregates=["id:recordset"],
+        )
+        return {line.id: allocations for line, allocations in groups}
+
     def _prepare_stock_moves(self, picking):
         self.ensure_one()
         val = super()._prepare_stock_moves(picking)
-        all_list = []
         for v in val:
-            all_ids = self.env["purchase.request.allocation"].search(
-                [("purchase_line_id", "=", v["purchase_line_id"])]
+            line = self if v["purchase_line_id"] == self.id else self.browse(
+                v["purchase_line_id"]
             )
-            for all_id in all_ids:
-                all_list.append((4, all_id.id))
-            v["purchase_request_allocation_ids"] = all_list
+            # Going through the one2many prefetches the allocations of all the
+            # order lines being processed in a single query.
+            v["purchase_request_allocation_ids"] = [
+                (4, alloc_id) for alloc_id in line.purchase_request_allocation_ids.ids
+            ]
         return val
 
     def update_service_allocations(self, prev_qty_received):
+        """Allocate the received service quantities to the PR lines.
+
+        :param prev_qty_received: received quantity before the update, either a
+            number or a dict {purchase.order.line id: quantity}
+        """
+        allocations_by_line = self._get_purchase_request_allocations_by_line(
+            [("purchase_line_id.product_id.type", "=", "service")]
+        )
         for rec in self:
-            allocation = self.env["purchase.request.allocation"].search(
-                [
-                    ("purchase_line_id", "=", rec.id),
-                    ("purchase_line_id.product_id.type", "=", "service"),
-                ]
-            )
+            allocation = allocations_by_line.get(rec.id)
             if not allocation:
-                return
-            qty_left = rec.qty_received - prev_qty_received
+                continue
+            if isinstance(prev_qty_received, dict):
+                qty_left = rec.qty_received - prev_qty_received[rec.id]
+            else:
+                qty_left = rec.qty_received - prev_qty_received
             for alloc in allocation:
                 allocated_product_qty = alloc.allocated_product_qty
                 if not qty_left:
@@ -272,6 +282,5 @@ class PurchaseOrderLine(models.Model):
                 prev_qty_received[line.id] = line.qty_received
         res = super().write(vals)
         if prev_qty_received:
-            for line in service_lines:
-                line.update_service_allocations(prev_qty_received[line.id])
+            service_lines.update_service_allocations(prev_qty_received)
         return res
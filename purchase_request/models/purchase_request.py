@@ -1,6 +1,7 @@
 # Copyright 2018-2019 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+import functools
 from datetime import timedelta
 
 from odoo import _, api, fields, models
@@ -11,13 +12,72 @@ PROJECT_PLAN_ID = 1
 PROJECT_STAGE_PLAN_ID = 2
 
 
-def replace_project_analytic(env, existing_distribution, new_project_account_id):
+@functools.lru_cache(maxsize=4096)
+def parse_analytic_distribution_key(key):
+    """Return the analytic account IDs of an analytic distribution key.
+
+    Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410').
+    The same keys come back on most lines, so the parsed keys are cached.
+
+    Returns:
+        Tuple of analytic account IDs
+    """
+    return tuple(
+        int(aid)
+        for aid in (part.strip() for part in str(key).split(","))
+        if aid.isdigit()
+    )
+
+
+def get_analytic_account_ids(distributions):
+    """Return the IDs of the analytic accounts used in the distributions.
+
+    Args:
+        distributions: Iterable of analytic distribution dicts (or None)
+
+    Returns:
+        Set of analytic account IDs
+    """
+    return {
+        account_id
+        for distribution in distributions
+        for key in distribution or {}
+        for account_id in parse_analytic_distribution_key(key)
+    }
+
+
+def get_analytic_plan_map(env, distributions):
+    """Read the plan of every analytic account used in the distributions at once.
+
+    Args:
+        env: Odoo environment
+        distributions: Iterable of analytic distribution dicts (or None)
+
+    Returns:
+        Dict {analytic account ID: plan ID}
+    """
+    account_ids = get_analytic_account_ids(distributions)
+    if not account_ids:
+        return {}
+    accounts = (
+        env["account.analytic.account"]
+        .with_context(active_test=False)
+        .search_fetch([("id", "in", list(account_ids))], ["plan_id"])
+    )
+    return {account.id: account.plan_id.id for account in accounts}
+
+
+def replace_project_analytic(
+    env, existing_distribution, new_project_account_id, plan_by_account=None
+):
     """Replace the project analytic account in a distribution, keeping other plans.
 
     Args:
         env: Odoo environment
         existing_distribution: Current analytic distribution dict (or None)
         new_project_account_id: ID of the new project's analytic account
+        plan_by_account: Optional {analytic account ID: plan ID} map, see
+            get_analytic_plan_map; read from the database when not given
 
     Returns:
         Updated analytic distribution dict
@@ -25,25 +85,29 @@ def replace_project_analytic(env, existing_distribution, new_project_account_id)
     if not existing_distribution:
         return {str(new_project_account_id): 100}
 
+    if plan_by_account is None:
+        plan_by_account = get_analytic_plan_map(env, [existing_distribution])
+
     new_distribution = {}
 
     # Process existing distribution - remove old project plan accounts, keep others
     for key, percentage in existing_distribution.items():
         # Keys can be single IDs or comma-separated IDs
-        account_ids = [int(aid.strip()) for aid in str(key).split(',') if aid.strip().isdigit()]
+        account_ids = parse_analytic_distribution_key(key)
 
         # Check if any of these accounts belong to the Project plan (id=1)
-        accounts = env['account.analytic.account'].browse(account_ids)
-        non_project_accounts = accounts.filtered(lambda a: a.plan_id.id != PROJECT_PLAN_ID)
+        non_project_account_ids = [
+            aid for aid in account_ids if plan_by_account.get(aid) != PROJECT_PLAN_ID
+        ]
 
-        if non_project_accounts:
+        if non_project_account_ids:
             # Keep the non-project accounts with their percentage
-            if len(non_project_accounts) == len(accounts):
+            if len(non_project_account_ids) == len(account_ids):
                 # All accounts are non-project, keep the key as-is
                 new_distribution[key] = percentage
             else:
                 # Some accounts were project accounts, rebuild key with only non-project ones
-                new_key = ','.join(str(a.id) for a in non_project_accounts)
+                new_key = ','.join(str(aid) for aid in non_project_account_ids)
                 new_distribution[new_key] = percentage
 
     # Add the new project analytic account
@@ -134,16 +198,10 @@ class PurchaseRequest(models.Model):
 
     @api.model
     def _default_picking_type(self):
-        type_obj = self.env["stock.picking.type"]
         company_id = self.env.context.get("company_id") or self.env.company.id
-        types = type_obj.search(
-            [("code", "=", "incoming"), ("warehouse_id.company_id", "=", company_id)]
+        return self.env["stock.warehouse"]._get_company_incoming_type(
+            self.env["res.company"].browse(company_id)
         )
-        if not types:
-            types = type_obj.search(
-                [("code", "=", "incoming"), ("warehouse_id", "=", False)]
-            )
-        return types[:1]
 
     @api.depends("state")
     def _compute_is_editable(self):
@@ -246,6 +304,11 @@ class PurchaseRequest(models.Model):
         copy=False,
         default="draft",
     )
+    date_approved = fields.Datetime(
+        string="Approval Date",
+        readonly=True,
+        copy=False,
+    )
     is_editable = fields.Boolean(compute="_compute_is_editable", readonly=True)
     to_approve_allowed = fields.Boolean(compute="_compute_to_approve_allowed")
     picking_type_id = fields.Many2one(
@@ -290,8 +353,10 @@ class PurchaseRequest(models.Model):
     transfer_ids = fields.Many2many(
         comodel_name="stock.picking",
         string="Internal Transfers",
-        compute="_compute_transfer_count",
-        store=True,
+        readonly=True,
+        copy=False,
+        help="Internal transfers of the request, kept up to date when the "
+        "allocations or their stock moves change.",
     )
     transfer_count = fields.Integer(
         string="Transfer count",
@@ -299,21 +364,81 @@ class PurchaseRequest(models.Model):
         store=True,
     )
 
-    @api.depends(
-        "line_ids.purchase_request_allocation_ids.stock_move_id.picking_id"
-    )
+    @api.depends("transfer_ids")
     def _compute_transfer_count(self):
         for rec in self:
-            transfers = rec.mapped(
-                "line_ids.purchase_request_allocation_ids.stock_move_id.picking_id"
-            ).filtered(lambda p: p.picking_type_id.code == "internal")
-            rec.transfer_ids = transfers
-            rec.transfer_count = len(transfers)
+            rec.transfer_count = len(rec.transfer_ids)
 
-    @api.depends("line_ids")
+    def _read_counts(self, query):
+        """Run a query counting related records and return {request id: count}.
+
+        The query takes the tuple of request ids as its only parameter and
+        returns (request_id, count) rows.
+        """
+        ids = tuple(self._origin.ids)
+        if not ids:
+            return {}
+        self.env.cr.execute(query, (ids,))
+        return dict(self.env.cr.fetchall())
+
+    def _get_transfer_ids_by_request(self):
+        """Return {request id: internal picking ids} read with a single query."""
+        self.env["purchase.request.line"].flush_model(["request_id"])
+        self.env["purchase.request.allocation"].flush_model(
+            ["purchase_request_line_id", "stock_move_id"]
+        )
+        self.env["stock.move"].flush_model(["picking_id"])
+        self.env["stock.picking"].flush_model(["picking_type_id"])
+        self.env.cr.execute(
+            """
+            SELECT prl.request_id, array_agg(DISTINCT sm.picking_id)
+            FROM purchase_request_allocation pra
+            JOIN purchase_request_line prl
+                ON prl.id = pra.purchase_request_line_id
+            JOIN stock_move sm ON sm.id = pra.stock_move_id
+            JOIN stock_picking sp ON sp.id = sm.picking_id
+            JOIN stock_picking_type spt ON spt.id = sp.picking_type_id
+            WHERE prl.request_id IN %s
+                AND spt.code = 'internal'
+            GROUP BY prl.request_id
+        """,
+            (tuple(self.ids),),
+        )
+        return dict(self.env.cr.fetchall())
+
+    def _update_transfer_ids(self):
+        """Synchronize the stored internal transfers of the requests.
+
+        Only the requests whose transfers actually changed are written.
+        """
+        # The link is technical, users creating transfers may not be allowed
+        # to write on the requests
+        requests = self.sudo().exists()
+        if not requests:
+            return
+        transfer_ids_by_request = requests._get_transfer_ids_by_request()
+        for rec in requests:
+            transfer_ids = set(transfer_ids_by_request.get(rec.id, []))
+            if transfer_ids != set(rec.transfer_ids.ids):
+                rec.transfer_ids = [(6, 0, sorted(transfer_ids))]
+
+    @api.depends("line_ids.purchase_lines.order_id")
     def _compute_purchase_count(self):
+        self.env["purchase.order.line"].flush_model(["order_id"])
+        self.env["purchase.request.line"].flush_model(["request_id", "purchase_lines"])
+        counts = self._read_counts(
+            """
+            SELECT prl.request_id, COUNT(DISTINCT pol.order_id)
+            FROM purchase_request_line prl
+            JOIN purchase_request_purchase_order_line_rel rel
+                ON rel.purchase_request_line_id = prl.id
+            JOIN purchase_order_line pol ON pol.id = rel.purchase_order_line_id
+            WHERE prl.request_id IN %s
+            GROUP BY prl.request_id
+        """
+        )
         for rec in self:
-            rec.purchase_count = len(rec.mapped("line_ids.purchase_lines.order_id"))
+            rec.purchase_count = counts.get(rec._origin.id, 0)
 
     def action_view_purchase_order(self):
         action = self.env["ir.actions.actions"]._for_xml_id("purchase.purchase_rfq")
@@ -327,12 +452,24 @@ class PurchaseRequest(models.Model):
             action["res_id"] = lines.id
         return action
 
-    @api.depends("line_ids")
+    @api.depends("line_ids.purchase_request_allocation_ids.stock_move_id")
     def _compute_move_count(self):
+        self.env["purchase.request.line"].flush_model(["request_id"])
+        self.env["purchase.request.allocation"].flush_model(
+            ["purchase_request_line_id", "stock_move_id"]
+        )
+        counts = self._read_counts(
+            """
+            SELECT prl.request_id, COUNT(DISTINCT pra.stock_move_id)
+            FROM purchase_request_allocation pra
+            JOIN purchase_request_line prl
+                ON prl.id = pra.purchase_request_line_id
+            WHERE prl.request_id IN %s
+            GROUP BY prl.request_id
+        """
+        )
         for rec in self:
-            rec.move_count = len(
-                rec.mapped("line_ids.purchase_request_allocation_ids.stock_move_id")
-            )
+            rec.move_count = counts.get(rec._origin.id, 0)
 
     def action_view_stock_picking(self):
         action = self.env["ir.actions.actions"]._for_xml_id(
@@ -493,12 +630,21 @@ class PurchaseRequest(models.Model):
         return self.write({"state": "to_approve"})
 
     def button_approved(self):
-        self.write({"state": "approved", "assigned_to": self.env.uid})
+        self.write(
+            {
+                "state": "approved",
+                "assigned_to": self.env.uid,
+                "date_approved": fields.Datetime.now(),
+            }
+        )
         self._create_rfq_activities()
         return True
 
     def _create_rfq_activities(self):
         """Create activities for all Purchase Officers to create RFQ."""
+        # Skipped in the same context as activity_schedule
+        if self.env.context.get('mail_activity_automation_skip'):
+            return
         # Check if feature is enabled in settings
         if not self.env['ir.config_parameter'].sudo().get_param(
             'purchase_request.auto_activity', False
@@ -520,15 +666,27 @@ class PurchaseRequest(models.Model):
         if not purchase_officers:
             return
 
-        # Create activity for each Purchase Officer
-        for pr in self:
-            for officer in purchase_officers:
-                pr.activity_schedule(
-                    'mail.mail_activity_data_todo',
-                    user_id=officer.id,
-                    summary=_("Create RFQ for PR %s") % pr.name,
-                    note=_("Purchase Request %s has been approved. Please create an RFQ.") % pr.name,
-                )
+        # Create the activities of every PR and officer in one batch, the
+        # activity type and the model are resolved once instead of per activity
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        date_deadline = activity_type._get_date_deadline()
+        vals_list = [
+            {
+                'activity_type_id': activity_type.id,
+                'automated': True,
+                'res_model_id': res_model_id,
+                'res_id': pr.id,
+                'user_id': officer.id,
+                'date_deadline': date_deadline,
+                'summary': _("Create RFQ for PR %s") % pr.name,
+                'note': _("Purchase Request %s has been approved. Please create an RFQ.") % pr.name,
+            }
+            for pr in self
+            for officer in purchase_officers
+        ]
+        # The assignees are notified like with activity_schedule
+        self.env['mail.activity'].create(vals_list)
 
     def button_rejected(self):
         self.mapped("line_ids").do_cancel()
@@ -538,30 +696,33 @@ class PurchaseRequest(models.Model):
         return self.write({"state": "in_progress"})
 
     def button_done(self):
-        """Mark PR as done, with confirmation if there are unfulfilled quantities."""
-        self.ensure_one()
+        """Mark PRs as done, with confirmation if there are unfulfilled quantities."""
         # Check for unfulfilled quantities
-        unfulfilled_lines = self.line_ids.filtered(
-            lambda l: not l.cancelled and l.unfulfilled_qty > 0
-        )
+        unfulfilled_lines = self._get_unfulfilled_lines()
         if unfulfilled_lines:
-            # Create confirmation wizard
-            wizard = self.env["purchase.request.confirm.done.wizard"].create({
-                "purchase_request_id": self.id,
-            })
-            # Create wizard lines for unfulfilled items
-            WizardLine = self.env["purchase.request.confirm.done.wizard.line"]
-            for line in unfulfilled_lines:
-                fulfilled = line.product_qty - line.unfulfilled_qty
-                WizardLine.create({
-                    "wizard_id": wizard.id,
-                    "pr_line_id": line.id,
-                    "product_id": line.product_id.id,
-                    "requested_qty": line.product_qty,
-                    "fulfilled_qty": fulfilled,
-                    "unfulfilled_qty": line.unfulfilled_qty,
-                    "product_uom_id": line.product_uom_id.id,
-                })
+            # Create one confirmation wizard for all the PRs, with a wizard
+            # line for each unfulfilled item
+            wizard = self.env["purchase.request.confirm.done.wizard"].create(
+                {
+                    "purchase_request_ids": [(6, 0, self.ids)],
+                    "line_ids": [
+                        (
+                            0,
+                            0,
+                            {
+                                "pr_line_id": line.id,
+                                "product_id": line.product_id.id,
+                                "requested_qty": line.product_qty,
+                                "fulfilled_qty": line.product_qty
+                                - line.unfulfilled_qty,
+                                "unfulfilled_qty": line.unfulfilled_qty,
+                                "product_uom_id": line.product_uom_id.id,
+                            },
+                        )
+                        for line in unfulfilled_lines
+                    ],
+                }
+            )
             return {
                 "name": _("Confirm Close Purchase Request"),
                 "type": "ir.actions.act_window",
@@ -572,6 +733,22 @@ class PurchaseRequest(models.Model):
             }
         return self.write({"state": "done"})
 
+    def _get_unfulfilled_lines(self):
+        """Return the lines of the PRs that are not cancelled and still have
+        an unfulfilled quantity, read with a single grouped query."""
+        groups = self.env["purchase.request.line"]._read_group(
+            [
+                ("request_id", "in", self.ids),
+                ("cancelled", "=", False),
+                ("unfulfilled_qty", ">", 0),
+            ],
+            groupby=["request_id"],
+            aggregates=["id:recordset"],
+        )
+        return self.env["purchase.request.line"].union(
+            *(lines for _request, lines in groups)
+        )
+
     def button_on_hold(self):
         """Open wizard to request on hold reason."""
         self.ensure_one()
@@ -650,33 +827,39 @@ class PurchaseRequest(models.Model):
         }
 
     def check_auto_done(self):
-        """Check if all lines are fulfilled and auto-set PR to done."""
-        for pr in self:
-            if pr.state not in ("approved", "in_progress"):
-                continue
-            # Check if all lines have unfulfilled_qty = 0
-            all_fulfilled = all(
-                line.unfulfilled_qty <= 0 and not line.cancelled
-                for line in pr.line_ids.filtered(lambda l: not l.cancelled)
-            )
-            if all_fulfilled and pr.line_ids:
-                pr.button_done()
+        """Check if all lines are fulfilled and auto-set PRs to done."""
+        requests = self.filtered(
+            lambda pr: pr.state in ("approved", "in_progress") and pr.line_ids
+        )
+        if not requests:
+            return
+        # Only PRs whose non cancelled lines all have unfulfilled_qty = 0, they
+        # are closed directly as button_done would look for the same lines
+        requests -= requests._get_unfulfilled_lines().request_id
+        if requests:
+            requests.write({"state": "done"})
 
     @api.onchange("project_id")
     def _onchange_project_id(self):
         """Set picking type from warehouse linked to project, and analytic distribution on lines."""
         if self.project_id:
             # Find warehouse linked to this project and set its receipt picking type
-            warehouse = self.env["stock.warehouse"]._get_warehouse_from_project(self.project_id)
-            if warehouse and warehouse.in_type_id:
-                self.picking_type_id = warehouse.in_type_id
+            in_type, _int_type = self.env["stock.warehouse"]._get_project_picking_types(
+                self.project_id
+            )
+            if in_type:
+                self.picking_type_id = in_type
 
             # Set analytic distribution on PR lines
             if self.project_id.account_id:
+                plan_by_account = get_analytic_plan_map(
+                    self.env, self.line_ids.mapped("analytic_distribution")
+                )
                 for line in self.line_ids:
                     # Replace project analytic, keep other plans (like project stage)
                     line.analytic_distribution = replace_project_analytic(
                         self.env,
                         line.analytic_distribution,
-                        self.project_id.account_id.id
+                        self.project_id.account_id.id,
+                        plan_by_account,
                     )
@@ -1,6 +1,8 @@
 # Copyright 2019 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+from collections import defaultdict
+
 from markupsafe import Markup
 
 from odoo import _, api, fields, models
@@ -84,14 +86,16 @@ class PurchaseRequestAllocation(models.Model):
     )
     def _compute_open_product_qty(self):
         for rec in self:
-            if rec.purchase_state in ["cancel", "done"]:
-                rec.open_product_qty = 0.0
-            else:
-                rec.open_product_qty = (
-                    rec.requested_product_uom_qty - rec.allocated_product_qty
-                )
-                if rec.open_product_qty < 0.0:
-                    rec.open_product_qty = 0.0
+            rec.open_product_qty = rec._get_open_product_qty()
+
+    def _get_open_product_qty(self, allocated_product_qty=None):
+        """Open quantity, optionally for a not yet written allocated quantity."""
+        self.ensure_one()
+        if self.purchase_state in ["cancel", "done"]:
+            return 0.0
+        if allocated_product_qty is None:
+            allocated_product_qty = self.allocated_product_qty
+        return max(0.0, self.requested_product_uom_qty - allocated_product_qty)
 
     @api.model
     def _purchase_request_confirm_done_message_content(self, message_data):
@@ -101,14 +105,15 @@ class PurchaseRequestAllocation(models.Model):
             "allocated to this purchase request"
         )
         message += "<ul>"
-        message += _(
-            "<li><b>%(product_name)s</b>: "
-            "Received quantity %(product_qty)s %(product_uom)s</li>"
-        ) % {
-            "product_name": html_escape(message_data["product_name"]),
-            "product_qty": message_data["product_qty"],
-            "product_uom": message_data["product_uom"],
-        }
+        for product_data in message_data.get("products", [message_data]):
+            message += _(
+                "<li><b>%(product_name)s</b>: "
+                "Received quantity %(product_qty)s %(product_uom)s</li>"
+            ) % {
+                "product_name": html_escape(product_data["product_name"]),
+                "product_qty": product_data["product_qty"],
+                "product_uom": product_data["product_uom"],
+            }
         message += "</ul>"
         return message
 
@@ -121,35 +126,93 @@ class PurchaseRequestAllocation(models.Model):
             "product_uom": po_line.product_uom.name,
         }
 
+    @api.model
+    def _merge_message_data(self, message_data_list):
+        """Merge the message data of several products into one message data."""
+        return dict(message_data_list[0], products=message_data_list)
+
     def _notify_allocation(self, allocated_qty):
         if not allocated_qty:
             return
-        for allocation in self:
+        self._notify_allocations(dict.fromkeys(self, allocated_qty))
+
+    @api.model
+    def _notify_allocations(self, qty_by_allocation):
+        """Post one message per purchase request summarizing its allocations.
+
+        :param qty_by_allocation: dict {allocation: allocated quantity}
+        """
+        message_data_by_request = defaultdict(list)
+        for allocation, allocated_qty in qty_by_allocation.items():
+            if not allocated_qty:
+                continue
             request = allocation.purchase_request_line_id.request_id
             po_line = allocation.purchase_line_id
-            message_data = self._prepare_message_data(po_line, request, allocated_qty)
-            message = self._purchase_request_confirm_done_message_content(message_data)
+            message_data_by_request[request].append(
+                self._prepare_message_data(po_line, request, allocated_qty)
+            )
+        for request, message_data_list in message_data_by_request.items():
+            message = self._purchase_request_confirm_done_message_content(
+                self._merge_message_data(message_data_list)
+            )
             request.message_post(
                 body=Markup(message),
                 subtype_id=self.env.ref("mail.mt_note").id,
             )
 
+    @api.model
+    def _write_allocated_product_qty(self, qty_by_allocation):
+        """Write the allocated quantities with one write per distinct value.
+
+        :param qty_by_allocation: dict {allocation: allocated quantity}
+        """
+        allocations_by_qty = defaultdict(self.browse)
+        for allocation, allocated_qty in qty_by_allocation.items():
+            allocations_by_qty[allocated_qty] |= allocation
+        for allocated_qty, allocations in allocations_by_qty.items():
+            allocations.write({"allocated_product_qty": allocated_qty})
+
+    def _allocate_done_moves(self):
+        """Allocate to each allocation the quantity done on its stock move.
+
+        All the quantities are computed in one pass, written grouped by value
+        and notified with a single message per purchase request.
+        """
+        qty_by_allocation = {}
+        for allocation in self:
+            move = allocation.stock_move_id
+            # Convert the move's quantity to the allocation's UoM
+            if allocation.product_uom_id and move.product_uom:
+                qty_by_allocation[allocation] = move.product_uom._compute_quantity(
+                    move.quantity, allocation.product_uom_id
+                )
+            else:
+                qty_by_allocation[allocation] = move.quantity
+        self._write_allocated_product_qty(qty_by_allocation)
+        self._notify_allocations(qty_by_allocation)
+
     def _trigger_pr_line_recompute(self, pr_lines=None):
-        """Trigger recomputation of PR line quantities."""
+        """Mark the PR line quantities for recomputation.
+
+        The fields are queued in the transaction's recompute set instead of
+        being recomputed right away: a loop of allocation writes therefore
+        recomputes each PR line once, when its quantities are next read or
+        when the transaction is flushed.
+        """
         if pr_lines is None:
             pr_lines = self.mapped("purchase_request_line_id")
         if pr_lines:
-            # Invalidate cache and trigger recomputation
-            pr_lines.invalidate_recordset(["qty_in_transfer", "unfulfilled_qty", "purchased_qty"])
-            pr_lines._compute_transfer_qty()
-            pr_lines._compute_unfulfilled_qty()
-            pr_lines._compute_purchased_qty()
+            for fname in ("qty_in_transfer", "purchased_qty", "unfulfilled_qty"):
+                self.env.add_to_compute(pr_lines._fields[fname], pr_lines)
 
     @api.model_create_multi
     def create(self, vals_list):
         allocations = super().create(vals_list)
         # Trigger recomputation on related PR lines
         allocations._trigger_pr_line_recompute()
+        allocations.filtered(
+            "stock_move_id.picking_id"
+        ).purchase_request_line_id.request_id._update_transfer_ids()
         return allocations
 
     def write(self, vals):
@@ -160,15 +223,17 @@ class PurchaseRequestAllocation(models.Model):
         pr_lines_after = self.mapped("purchase_request_line_id")
         # Trigger recomputation on all affected PR lines
         self._trigger_pr_line_recompute(pr_lines_before | pr_lines_after)
+        if "stock_move_id" in vals or "purchase_request_line_id" in vals:
+            (pr_lines_before | pr_lines_after).request_id._update_transfer_ids()
         return res
 
     def unlink(self):
         pr_lines = self.mapped("purchase_request_line_id")
+        requests = self.filtered("stock_move_id.picking_id").mapped(
+            "purchase_request_line_id.request_id"
+        )
         res = super().unlink()
         # Trigger recomputation on PR lines after unlinking
-        if pr_lines:
-            pr_lines.invalidate_recordset(["qty_in_transfer", "unfulfilled_qty", "purchased_qty"])
-            pr_lines._compute_transfer_qty()
-            pr_lines._compute_unfulfilled_qty()
-            pr_lines._compute_purchased_qty()
+        self._trigger_pr_line_recompute(pr_lines)
+        requests._update_transfer_ids()
         return res
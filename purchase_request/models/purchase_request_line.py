@@ -1,9 +1,15 @@
 # Copyright 2018-2019 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+import re
+from collections import defaultdict
+from html import unescape
+
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from .purchase_request import get_analytic_account_ids
+
 # Analytic plan IDs for project and project stage validation
 PROJECT_PLAN_ID = 1
 PROJECT_STAGE_PLAN_ID = 2
@@ -25,13 +31,7 @@ def validate_analytic_distribution(env, analytic_distribution, record_name="reco
 
     # Get analytic accounts from distribution
     # Keys can be single IDs or comma-separated IDs (e.g., '242' or '242,410')
-    analytic_account_ids = set()
-    for key in analytic_distribution.keys():
-        for aid in str(key).split(','):
-            try:
-                analytic_account_ids.add(int(aid.strip()))
-            except ValueError:
-                continue
+    analytic_account_ids = get_analytic_account_ids([analytic_distribution])
 
     if not analytic_account_ids:
         raise ValidationError(_('Analytic distribution is required on %s.') % record_name)
@@ -53,6 +53,37 @@ def validate_analytic_distribution(env, analytic_distribution, record_name="reco
     if not has_project_stage:
         raise ValidationError(_('Please select a Project Stage in the analytic distribution on %s.') % record_name)
 
+# Length of the plain text preview of the technical description
+TECHNICAL_DESCRIPTION_PREVIEW_LENGTH = 100
+# Either a tag or a text node of an HTML document
+_HTML_NODE_RE = re.compile(r"<[^>]*>|([^<]+)")
+
+
+def html_to_text_preview(html, length=TECHNICAL_DESCRIPTION_PREVIEW_LENGTH):
+    """Return the text of an HTML document, whitespace collapsed, truncated.
+
+    The document is scanned with a single regex and only until enough text
+    was collected for the preview, so large documents are not fully parsed.
+    """
+    if not html:
+        return False
+    chunks = []
+    size = 0
+    for match in _HTML_NODE_RE.finditer(html):
+        text = match.group(1)
+        if not text:
+            continue
+        words = unescape(text).split()
+        if not words:
+            continue
+        chunks.extend(words)
+        size += sum(len(word) for word in words)
+        if size > length:
+            break
+    text = " ".join(chunks)
+    return text[:length] + "..." if len(text) > length else text
+
+
 _STATES = [
     ("draft", "Draft"),
     ("to_approve", "To be approved"),
@@ -138,17 +169,12 @@ class PurchaseRequestLine(models.Model):
 
     @api.depends("technical_description")
     def _compute_technical_description_text(self):
-        """Convert HTML to plain text for list view display."""
-        import re
+        """Convert HTML to a plain text preview for list view display."""
         for line in self:
-            if line.technical_description:
-                # Strip HTML tags for plain text display
-                text = re.sub(r'<[^>]+>', '', line.technical_description)
-                # Clean up whitespace
-                text = ' '.join(text.split())
-                line.technical_description_text = text[:100] + '...' if len(text) > 100 else text
-            else:
-                line.technical_description_text = False
+            line.technical_description_text = html_to_text_preview(
+                line.technical_description
+            )
+
     request_state = fields.Selection(
         string="Request state",
         related="request_id.state",
@@ -395,10 +421,59 @@ class PurchaseRequestLine(models.Model):
         for rec in self.filtered(lambda p: p.purchase_lines):
             rec.is_editable = False
 
+    @api.model
+    def _get_seller_map(self, products, company=None):
+        """Read the valid sellers of many products in a single query.
+
+        Only sellers whose validity dates include today are kept, and when a
+        company is given, only the sellers shared or belonging to it. The
+        result can be passed around to the supplier helpers so that a batch
+        of lines does not scan ``seller_ids`` product by product.
+
+        :return: dict {product.product id: product.supplierinfo recordset},
+            each recordset sorted in the supplierinfo order (preferred first)
+        """
+        supplierinfo_obj = self.env["product.supplierinfo"]
+        seller_map = {product.id: supplierinfo_obj for product in products}
+        if not products:
+            return seller_map
+        today = fields.Date.context_today(self)
+        domain = [
+            ("product_tmpl_id", "in", products.product_tmpl_id.ids),
+            "|",
+            ("date_start", "=", False),
+            ("date_start", "<=", today),
+            "|",
+            ("date_end", "=", False),
+            ("date_end", ">=", today),
+        ]
+        if company:
+            domain.append(("company_id", "in", [False, company.id]))
+        sellers = supplierinfo_obj.search(domain)
+        sellers_by_template = defaultdict(list)
+        for seller in sellers:
+            sellers_by_template[seller.product_tmpl_id.id].append(seller)
+        for product in products:
+            seller_map[product.id] = supplierinfo_obj.union(
+                *(
+                    seller
+                    for seller in sellers_by_template[product.product_tmpl_id.id]
+                    if not seller.product_id or seller.product_id == product
+                )
+            )
+        return seller_map
+
+    @api.model
+    def _get_product_sellers(self, product, seller_map=None):
+        if seller_map is None or product.id not in seller_map:
+            seller_map = self._get_seller_map(product)
+        return seller_map.get(product.id, self.env["product.supplierinfo"])
+
     @api.depends("product_id", "product_id.seller_ids")
     def _compute_supplier_id(self):
+        seller_map = self._get_seller_map(self.product_id)
         for rec in self:
-            sellers = rec.product_id.seller_ids.filtered(
+            sellers = self._get_product_sellers(rec.product_id, seller_map).filtered(
                 lambda si, rec=rec: not si.company_id or si.company_id == rec.company_id
             )
             rec.supplier_id = sellers[0].partner_id if sellers else False
@@ -500,21 +575,27 @@ class PurchaseRequestLine(models.Model):
             rec.purchase_state = temp_purchase_state
 
     @api.model
-    def _get_supplier_min_qty(self, product, partner_id=False):
+    def _get_supplier_min_qty(self, product, partner_id=False, seller_map=None):
         seller_min_qty = 0.0
+        sellers = self._get_product_sellers(product, seller_map)
         if partner_id:
-            seller = product.seller_ids.filtered(
-                lambda r: r.partner_id == partner_id
-            ).sorted(key=lambda r: r.min_qty)
+            seller = sellers.filtered(lambda r: r.partner_id == partner_id).sorted(
+                key=lambda r: r.min_qty
+            )
         else:
-            seller = product.seller_ids.sorted(key=lambda r: r.min_qty)
+            seller = sellers.sorted(key=lambda r: r.min_qty)
         if seller:
             seller_min_qty = seller[0].min_qty
         return seller_min_qty
 
     @api.model
     def _calc_new_qty(
-        self, request_line, po_line=None, new_pr_line=False, wizard_qty=None
+        self,
+        request_line,
+        po_line=None,
+        new_pr_line=False,
+        wizard_qty=None,
+        seller_map=None,
     ):
         """Calculate the new quantity for a PO line based on PR allocations.
 
@@ -524,6 +605,7 @@ class PurchaseRequestLine(models.Model):
             new_pr_line: Whether this is a new PR line being added
             wizard_qty: The quantity from the wizard item (if provided, uses this
                        for the current request_line instead of its product_qty)
+            seller_map: Optional result of ``_get_seller_map`` to reuse
         """
         purchase_uom = po_line.product_uom or request_line.product_id.uom_po_id
         # TODO: Not implemented yet.
@@ -532,7 +614,7 @@ class PurchaseRequestLine(models.Model):
         supplierinfo_min_qty = 0.0
         if not po_line.order_id.dest_address_id:
             supplierinfo_min_qty = self._get_supplier_min_qty(
-                po_line.product_id, po_line.order_id.partner_id
+                po_line.product_id, po_line.order_id.partner_id, seller_map=seller_map
             )
 
         rl_qty = 0.0
@@ -563,7 +645,12 @@ class PurchaseRequestLine(models.Model):
                         "if the purchase request is in draft state."
                     )
                 )
-        return super().unlink()
+        # The allocations are deleted by the database cascade, which bypasses
+        # their unlink: resynchronize the transfers of the requests
+        requests = self.request_id
+        res = super().unlink()
+        requests._update_transfer_ids()
+        return res
 
     def action_show_details(self):
         self.ensure_one()
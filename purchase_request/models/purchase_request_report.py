@@ -0,0 +1,217 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+
+from odoo import api, fields, models
+from odoo.tools.sql import SQL, drop_view_if_exists
+
+from .purchase_request import _STATES
+
+
+class PurchaseRequestReport(models.Model):
+    """Purchase request pipeline analysis, one row per request line.
+
+    The report is a materialized view refreshed by cron: reading it does not
+    join the purchase and stock tables again, so the pivot and graph views
+    stay fast on large databases at the cost of lagging behind until the
+    next refresh.
+    """
+
+    _name = "purchase.request.report"
+    _description = "Purchase Request Analysis"
+    _auto = False
+    _order = "date_request desc"
+
+    request_id = fields.Many2one(
+        comodel_name="purchase.request", string="Purchase Request", readonly=True
+    )
+    product_id = fields.Many2one(
+        comodel_name="product.product", string="Product", readonly=True
+    )
+    categ_id = fields.Many2one(
+        comodel_name="product.category", string="Product Category", readonly=True
+    )
+    product_uom_id = fields.Many2one(
+        comodel_name="uom.uom", string="UoM", readonly=True
+    )
+    project_id = fields.Many2one(
+        comodel_name="project.project", string="Project", readonly=True
+    )
+    warehouse_id = fields.Many2one(
+        comodel_name="stock.warehouse", string="Warehouse", readonly=True
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company", string="Company", readonly=True
+    )
+    requested_by = fields.Many2one(
+        comodel_name="res.users", string="Requested by", readonly=True
+    )
+    state = fields.Selection(selection=_STATES, string="Status", readonly=True)
+    date_request = fields.Datetime(string="Request Date", readonly=True)
+    date_approved = fields.Datetime(string="Approval Date", readonly=True)
+    date_rfq = fields.Datetime(string="RFQ Date", readonly=True)
+    date_po_confirmed = fields.Datetime(string="PO Confirmation Date", readonly=True)
+    date_received = fields.Datetime(string="Receipt Date", readonly=True)
+    product_qty = fields.Float(
+        string="Requested Qty", digits="Product Unit of Measure", readonly=True
+    )
+    purchased_qty = fields.Float(
+        string="RFQ/PO Qty", digits="Product Unit of Measure", readonly=True
+    )
+    received_qty = fields.Float(
+        string="Received Qty",
+        digits="Product Unit of Measure",
+        readonly=True,
+        help="Quantity received from the vendors for the request line, in the "
+        "UoM of the request line",
+    )
+    delay_approval = fields.Float(
+        string="Days to Approve", aggregator="avg", readonly=True
+    )
+    delay_rfq = fields.Float(
+        string="Days from Approval to RFQ", aggregator="avg", readonly=True
+    )
+    delay_po = fields.Float(
+        string="Days from RFQ to PO", aggregator="avg", readonly=True
+    )
+    delay_receipt = fields.Float(
+        string="Days from PO to Receipt", aggregator="avg", readonly=True
+    )
+    delay_total = fields.Float(
+        string="Days from Request to Receipt", aggregator="avg", readonly=True
+    )
+
+    def _with_purchase(self):
+        return SQL(
+            """
+            SELECT
+                rel.purchase_request_line_id AS line_id,
+                MIN(po.create_date) AS date_rfq,
+                MIN(po.date_approve) AS date_po_confirmed
+            FROM purchase_request_purchase_order_line_rel rel
+            JOIN purchase_order_line pol ON pol.id = rel.purchase_order_line_id
+            JOIN purchase_order po ON po.id = pol.order_id
+            WHERE po.state != 'cancel'
+            GROUP BY rel.purchase_request_line_id
+            """
+        )
+
+    def _with_receipt(self):
+        return SQL(
+            """
+            SELECT
+                pra.purchase_request_line_id AS line_id,
+                MAX(sm.date) AS date_received,
+                SUM(pra.allocated_product_qty) AS received_qty
+            FROM purchase_request_allocation pra
+            JOIN stock_move sm ON sm.id = pra.stock_move_id
+            JOIN stock_picking_type spt ON spt.id = sm.picking_type_id
+            WHERE sm.state = 'done'
+                AND spt.code = 'incoming'
+            GROUP BY pra.purchase_request_line_id
+            """
+        )
+
+    def _delay(self, date_from, date_to):
+        """Number of days between two timestamp columns of the query."""
+        return SQL(
+            "EXTRACT(EPOCH FROM (%s - %s)) / 86400.0",
+            SQL(date_to),
+            SQL(date_from),
+        )
+
+    def _select(self):
+        return SQL(
+            """
+            SELECT
+                prl.id AS id,
+                prl.request_id AS request_id,
+                prl.product_id AS product_id,
+                pt.categ_id AS categ_id,
+                prl.product_uom_id AS product_uom_id,
+                pr.project_id AS project_id,
+                spt.warehouse_id AS warehouse_id,
+                pr.company_id AS company_id,
+                pr.requested_by AS requested_by,
+                pr.state AS state,
+                pr.create_date AS date_request,
+                pr.date_approved AS date_approved,
+                purchase.date_rfq AS date_rfq,
+                purchase.date_po_confirmed AS date_po_confirmed,
+                receipt.date_received AS date_received,
+                prl.product_qty AS product_qty,
+                prl.purchased_qty AS purchased_qty,
+                COALESCE(receipt.received_qty, 0.0) AS received_qty,
+                %(delay_approval)s AS delay_approval,
+                %(delay_rfq)s AS delay_rfq,
+                %(delay_po)s AS delay_po,
+                %(delay_receipt)s AS delay_receipt,
+                %(delay_total)s AS delay_total
+            """,
+            delay_approval=self._delay("pr.create_date", "pr.date_approved"),
+            delay_rfq=self._delay("pr.date_approved", "purchase.date_rfq"),
+            delay_po=self._delay("purchase.date_rfq", "purchase.date_po_confirmed"),
+            delay_receipt=self._delay(
+                "purchase.date_po_confirmed", "receipt.date_received"
+            ),
+            delay_total=self._delay("pr.create_date", "receipt.date_received"),
+        )
+
+    def _from(self):
+        return SQL(
+            """
+            FROM purchase_request_line prl
+            JOIN purchase_request pr ON pr.id = prl.request_id
+            LEFT JOIN product_product pp ON pp.id = prl.product_id
+            LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            LEFT JOIN stock_picking_type spt ON spt.id = pr.picking_type_id
+            LEFT JOIN purchase ON purchase.line_id = prl.id
+            LEFT JOIN receipt ON receipt.line_id = prl.id
+            """
+        )
+
+    def _query(self):
+        return SQL(
+            "WITH purchase AS (%s), receipt AS (%s) %s %s",
+            self._with_purchase(),
+            self._with_receipt(),
+            self._select(),
+            self._from(),
+        )
+
+    def init(self):
+        drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(
+            SQL(
+                "CREATE MATERIALIZED VIEW %s AS (%s)",
+                SQL.identifier(self._table),
+                self._query(),
+            )
+        )
+        # A unique index is required to refresh the view concurrently
+        self.env.cr.execute(
+            SQL(
+                "CREATE UNIQUE INDEX %s ON %s (id)",
+                SQL.identifier(f"{self._table}_id_uniq"),
+                SQL.identifier(self._table),
+            )
+        )
+        for fname in ("project_id", "warehouse_id", "categ_id", "date_request"):
+            self.env.cr.execute(
+                SQL(
+                    "CREATE INDEX %s ON %s (%s)",
+                    SQL.identifier(f"{self._table}_{fname}_index"),
+                    SQL.identifier(self._table),
+                    SQL.identifier(fname),
+                )
+            )
+
+    @api.model
+    def _refresh_view(self):
+        """Refresh the materialized view without blocking its readers."""
+        self.env.flush_all()
+        self.env.cr.execute(
+            SQL(
+                "REFRESH MATERIALIZED VIEW CONCURRENTLY %s",
+                SQL.identifier(self._table),
+            )
+        )
+        self.invalidate_model()
@@ -78,6 +78,22 @@ class StockMove(models.Model):
                 rec.purchase_request_allocation_ids.purchase_request_line_id.request_id
             )
 
+    def write(self, vals):
+        res = super().write(vals)
+        if "picking_id" in vals:
+            allocations = self.purchase_request_allocation_ids
+            allocations.purchase_request_line_id.request_id._update_transfer_ids()
+        return res
+
+    def unlink(self):
+        # The allocations are deleted by the database cascade, which bypasses
+        # their unlink: resynchronize the transfers of their requests
+        allocations = self.purchase_request_allocation_ids
+        requests = allocations.purchase_request_line_id.request_id
+        res = super().unlink()
+        requests._update_transfer_ids()
+        return res
+
     def _merge_moves_fields(self):
         res = super()._merge_moves_fields()
         res["purchase_request_allocation_ids"] = [
@@ -112,24 +128,13 @@ class StockMove(models.Model):
     def _action_done(self, cancel_backorder=False):
         """Update allocation's allocated_product_qty when moves are completed."""
         res = super()._action_done(cancel_backorder=cancel_backorder)
-        purchase_requests = self.env["purchase.request"]
-        for move in self.filtered(lambda m: m.state == "done"):
-            for allocation in move.purchase_request_allocation_ids:
-                # Update the allocated quantity based on what was actually received
-                # Convert the move's quantity to the allocation's UoM
-                if allocation.product_uom_id and move.product_uom:
-                    allocated_qty = move.product_uom._compute_quantity(
-                        move.quantity, allocation.product_uom_id
-                    )
-                else:
-                    allocated_qty = move.quantity
-                # Update allocation with the received quantity
-                allocation.allocated_product_qty = allocated_qty
-                allocation._notify_allocation(allocated_qty)
-                # Collect PR for auto-done check
-                if allocation.purchase_request_line_id.request_id:
-                    purchase_requests |= allocation.purchase_request_line_id.request_id
+        allocations = self.filtered(
+            lambda m: m.state == "done"
+        ).purchase_request_allocation_ids
+        # Update the allocated quantity based on what was actually received
+        allocations._allocate_done_moves()
         # Check if any related PRs should be auto-done
+        purchase_requests = allocations.purchase_request_line_id.request_id
         if purchase_requests:
             purchase_requests.check_auto_done()
         return res
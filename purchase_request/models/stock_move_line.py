@@ -1,6 +1,8 @@
 # Copyright 2017 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+from collections import defaultdict
+
 from markupsafe import Markup
 
 from odoo import _, api, models
@@ -29,15 +31,23 @@ class StockMoveLine(models.Model):
             picking_name=message_data["picking_name"],
         )
 
+        product_lines = self._product_lines_message_content(message_data)
+        return Markup("<h3>{}</h3>{}{}").format(title, message_body, product_lines)
+
+    @api.model
+    def _product_lines_message_content(self, message_data):
         product_line = Markup(
-            "<ul><li><b>{}</b>: " + _("Transferred quantity") + " {} {}</li></ul>"
-        ).format(
-            html_escape(message_data["product_name"]),
-            message_data["product_qty"],
-            html_escape(message_data["product_uom"]),
+            "<li><b>{}</b>: " + _("Transferred quantity") + " {} {}</li>"
         )
-
-        return Markup("<h3>{}</h3>{}{}").format(title, message_body, product_line)
+        product_lines = Markup("").join(
+            product_line.format(
+                html_escape(product_data["product_name"]),
+                product_data["product_qty"],
+                html_escape(product_data["product_uom"]),
+            )
+            for product_data in message_data.get("products", [message_data])
+        )
+        return Markup("<ul>{}</ul>").format(product_lines)
 
     @api.model
     def _picking_confirm_done_message_content(self, message_data):
@@ -55,15 +65,8 @@ class StockMoveLine(models.Model):
             location_name=message_data["location_name"],
         )
 
-        product_line = Markup(
-            "<ul><li><b>{}</b>: " + _("Transferred quantity") + " {} {}</li></ul>"
-        ).format(
-            html_escape(message_data["product_name"]),
-            message_data["product_qty"],
-            html_escape(message_data["product_uom"]),
-        )
-
-        return Markup("<h3>{}</h3>{}{}").format(title, message_body, product_line)
+        product_lines = self._product_lines_message_content(message_data)
+        return Markup("<h3>{}</h3>{}{}").format(title, message_body, product_lines)
 
     def _prepare_message_data(self, ml, request, allocated_qty):
         return {
@@ -77,54 +80,81 @@ class StockMoveLine(models.Model):
         }
 
     def allocate(self):
+        """Allocate the done quantities of the move lines to their PR lines.
+
+        All the move lines are processed in one pass: the quantities are
+        accumulated per allocation, written grouped by value, and a single
+        summarized message is posted per purchase request and per picking.
+        """
+        # We do sudo because potentially the user that completes the move
+        #  may not have permissions for purchase.request.
+        allocation_obj = self.env["purchase.request.allocation"].sudo()
+        qty_by_allocation = {}
+        message_data_by_picking = defaultdict(lambda: defaultdict(list))
         for ml in self.filtered(
             lambda m: m.exists() and m.move_id.purchase_request_allocation_ids
         ):
-            # We do sudo because potentially the user that completes the move
-            #  may not have permissions for purchase.request.
             to_allocate_qty = ml.quantity
             to_allocate_uom = ml.product_uom_id
             for allocation in ml.move_id.purchase_request_allocation_ids.sudo():
                 allocated_qty = 0.0
-                if allocation.open_product_qty and to_allocate_qty:
+                current_qty = qty_by_allocation.get(
+                    allocation, allocation.allocated_product_qty
+                )
+                open_qty = allocation._get_open_product_qty(current_qty)
+                if open_qty and to_allocate_qty:
                     to_allocate_uom_qty = to_allocate_uom._compute_quantity(
                         to_allocate_qty, allocation.product_uom_id
                     )
-                    allocated_qty = min(
-                        allocation.open_product_qty, to_allocate_uom_qty
-                    )
-                    allocation.allocated_product_qty += allocated_qty
+                    allocated_qty = min(open_qty, to_allocate_uom_qty)
+                    qty_by_allocation[allocation] = current_qty + allocated_qty
                     to_allocate_uom_qty -= allocated_qty
                     to_allocate_qty = allocation.product_uom_id._compute_quantity(
                         to_allocate_uom_qty, to_allocate_uom
                     )
 
-                request = allocation.purchase_request_line_id.request_id
                 if allocated_qty:
-                    message_data = self._prepare_message_data(
-                        ml, request, allocated_qty
+                    request = allocation.purchase_request_line_id.request_id
+                    message_data_by_picking[ml.move_id.picking_id][request].append(
+                        self._prepare_message_data(ml, request, allocated_qty)
                     )
-                    message = self._purchase_request_confirm_done_message_content(
-                        message_data
-                    )
-                    if message:
-                        request.message_post(
-                            body=Markup(message),
-                            subtype_id=self.env.ref(
-                                "purchase_request.mt_request_picking_done"
-                            ).id,
-                        )
-
-                    picking_message = self._picking_confirm_done_message_content(
-                        message_data
-                    )
-                    if picking_message:
-                        ml.move_id.picking_id.message_post(
-                            body=Markup(picking_message),
-                            subtype_id=self.env.ref("mail.mt_comment").id,
-                        )
 
-                allocation._compute_open_product_qty()
+        allocation_obj._write_allocated_product_qty(qty_by_allocation)
+        self._post_allocation_messages(message_data_by_picking)
+
+    def _post_allocation_messages(self, message_data_by_picking):
+        """Post one message per purchase request and one per picking.
+
+        :param message_data_by_picking: dict {picking: {request: [message data]}}
+        """
+        request_subtype_id = self.env.ref(
+            "purchase_request.mt_request_picking_done"
+        ).id
+        picking_subtype_id = self.env.ref("mail.mt_comment").id
+        for picking, message_data_by_request in message_data_by_picking.items():
+            picking_messages = []
+            for request, message_data_list in message_data_by_request.items():
+                message_data = self.env[
+                    "purchase.request.allocation"
+                ]._merge_message_data(message_data_list)
+                message = self._purchase_request_confirm_done_message_content(
+                    message_data
+                )
+                if message:
+                    request.message_post(
+                        body=Markup(message),
+                        subtype_id=request_subtype_id,
+                    )
+                picking_message = self._picking_confirm_done_message_content(
+                    message_data
+                )
+                if picking_message:
+                    picking_messages.append(picking_message)
+            if picking and picking_messages:
+                picking.message_post(
+                    body=Markup("").join(picking_messages),
+                    subtype_id=picking_subtype_id,
+                )
 
     def _action_done(self):
         res = super()._action_done()
@@ -1,7 +1,12 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+import logging
+
 from odoo import _, api, models
 from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
 
 
 class StockPicking(models.Model):
@@ -9,24 +14,57 @@ class StockPicking(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        """Override create to send email notifications to storekeepers."""
+        """Override create to notify storekeepers of the new transfers."""
         pickings = super().create(vals_list)
-        for picking in pickings:
-            picking._send_storekeeper_notifications()
+        pickings._queue_storekeeper_notifications()
         return pickings
 
-    def _send_storekeeper_notifications(self):
-        """Send email notifications to storekeepers when transfer is created."""
-        self.ensure_one()
+    def write(self, vals):
+        res = super().write(vals)
+        if "picking_type_id" in vals:
+            allocations = self.move_ids.purchase_request_allocation_ids
+            allocations.purchase_request_line_id.request_id._update_transfer_ids()
+        return res
 
-        # Get the email template
-        template = self.env.ref(
-            "purchase_request.email_template_stock_transfer_notification",
-            raise_if_not_found=False,
-        )
-        if not template:
+    def _queue_storekeeper_notifications(self):
+        """Queue storekeeper notifications until the transaction is committed.
+
+        All the pickings created in the same transaction are notified together
+        after commit, with one digest email per storekeeper.
+        """
+        if not self:
             return
+        postcommit = self.env.cr.postcommit
+        queue = postcommit.data.setdefault(
+            "purchase_request.storekeeper_notifications", set()
+        )
+        if not queue:
+            dbname = self.env.cr.dbname
+            uid = self.env.uid
+            context = dict(self.env.context)
+
+            @postcommit.add
+            def send_storekeeper_notifications():
+                # The transaction of the pickings is already committed, a
+                # failure must not surface to the user
+                try:
+                    with Registry(dbname).cursor() as cr:
+                        env = api.Environment(cr, uid, context)
+                        pickings = env["stock.picking"].browse(queue).exists()
+                        pickings._send_storekeeper_notifications()
+                except Exception:
+                    _logger.exception(
+                        "Failed to send the storekeeper notifications of the "
+                        "transfers %s",
+                        sorted(queue),
+                    )
 
+        queue.update(self.ids)
+
+    def _get_storekeeper_notification_recipients(self):
+        """Return the (storekeeper, location type) pairs to notify of this transfer."""
+        self.ensure_one()
+        recipients = []
         picking_type = self.picking_type_id.code
 
         if picking_type == "internal":
@@ -36,11 +74,7 @@ class StockPicking(models.Model):
 
             # Send to source storekeeper
             if source_warehouse and source_warehouse.storekeeper_id:
-                self._send_notification_email(
-                    template,
-                    source_warehouse.storekeeper_id,
-                    "source",
-                )
+                recipients.append((source_warehouse.storekeeper_id, "source"))
 
             # Send to destination storekeeper
             if dest_warehouse and dest_warehouse.storekeeper_id:
@@ -50,38 +84,54 @@ class StockPicking(models.Model):
                     or source_warehouse.storekeeper_id
                     != dest_warehouse.storekeeper_id
                 ):
-                    self._send_notification_email(
-                        template,
-                        dest_warehouse.storekeeper_id,
-                        "destination",
-                    )
+                    recipients.append((dest_warehouse.storekeeper_id, "destination"))
 
         elif picking_type == "incoming":
             # Receipt - notify destination storekeeper
             dest_warehouse = self.location_dest_id.warehouse_id
             if dest_warehouse and dest_warehouse.storekeeper_id:
-                self._send_notification_email(
-                    template,
-                    dest_warehouse.storekeeper_id,
-                    "destination",
+                recipients.append((dest_warehouse.storekeeper_id, "destination"))
+        return recipients
+
+    def _send_storekeeper_notifications(self):
+        """Send one digest email per storekeeper listing all their new transfers."""
+        # Get the email template
+        template = self.env.ref(
+            "purchase_request.email_template_stock_transfer_digest",
+            raise_if_not_found=False,
+        )
+        if not template:
+            return
+
+        digests = {}
+        for picking in self.sudo():
+            for employee, location_type in (
+                picking._get_storekeeper_notification_recipients()
+            ):
+                pickings_by_type = digests.setdefault(
+                    employee,
+                    {"source": self.browse(), "destination": self.browse()},
                 )
+                pickings_by_type[location_type] |= picking
+        for employee, pickings_by_type in digests.items():
+            self._send_notification_digest(template, employee, pickings_by_type)
 
-    def _send_notification_email(self, template, employee, location_type):
-        """Send notification email to a storekeeper (employee)."""
+    @api.model
+    def _send_notification_digest(self, template, employee, pickings_by_type):
+        """Send the transfer digest email to a storekeeper (employee)."""
         # Get email from employee's work email or linked user
         email = employee.work_email or (employee.user_id and employee.user_id.email)
         if not email:
             return
 
-        # Use context to pass additional info to the template
+        # Use context to pass the transfers to the template
         ctx = {
             "recipient_name": employee.name,
-            "recipient_email": email,
-            "location_type": location_type,
-            "picking_type_name": self.picking_type_id.name,
+            "source_pickings": pickings_by_type["source"],
+            "destination_pickings": pickings_by_type["destination"],
         }
-        template.with_context(**ctx).send_mail(
-            self.id,
+        template.sudo().with_context(**ctx).send_mail(
+            employee.id,
             force_send=False,
             email_values={"email_to": email},
         )
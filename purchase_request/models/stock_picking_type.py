@@ -0,0 +1,36 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+
+from odoo import api, models
+
+# Picking type fields read by the cached picking type map
+PICKING_TYPE_MAP_FIELDS = {
+    "active",
+    "code",
+    "company_id",
+    "sequence",
+    "warehouse_id",
+}
+
+
+class StockPickingType(models.Model):
+    _inherit = "stock.picking.type"
+
+    # The picking types are part of the cached warehouse map, see
+    # stock.warehouse._get_picking_type_map
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        picking_types = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return picking_types
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PICKING_TYPE_MAP_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
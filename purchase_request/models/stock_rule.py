@@ -81,10 +81,13 @@ class StockRule(models.Model):
 
     def _run_buy(self, procurements):
         indexes_to_pop = []
+        pr_procurements = []
         for i, procurement in enumerate(procurements):
             if self.is_create_purchase_request_allowed(procurement):
-                self.create_purchase_request(procurement)
+                pr_procurements.append(procurement)
                 indexes_to_pop.append(i)
+        if pr_procurements:
+            self._create_purchase_requests(pr_procurements)
         if indexes_to_pop:
             indexes_to_pop.reverse()
             for index in indexes_to_pop:
@@ -93,39 +96,79 @@ class StockRule(models.Model):
             return
         return super()._run_buy(procurements)
 
-    def create_purchase_request(self, procurement_group):
+    @api.model
+    def _merge_purchase_request_origin(self, origin, procurement_origin):
+        if (
+            not origin
+            or procurement_origin not in origin.split(", ")
+            and procurement_origin != "/"
+        ):
+            if origin:
+                if procurement_origin:
+                    return origin + ", " + procurement_origin
+            else:
+                return procurement_origin
+        return origin
+
+    def _create_purchase_requests(self, procurements):
         """
-        Create a purchase request containing procurement order product.
+        Create the purchase requests of many procurements at once.
+
+        Procurements are grouped by the domain of the purchase request they
+        extend, so there is a single search per group, the missing requests
+        are created together and all the lines in one create call.
+        :param procurements: list of (procurement, rule) tuples
         """
-        procurement = procurement_group[0]
-        rule = procurement_group[1]
         purchase_request_model = self.env["purchase.request"]
-        purchase_request_line_model = self.env["purchase.request.line"]
-        cache = {}
-        pr = self.env["purchase.request"]
-        domain = rule._make_pr_get_domain(procurement.values)
-        if domain in cache:
-            pr = cache[domain]
-        elif domain:
-            pr = self.env["purchase.request"].search([dom for dom in domain])
-            pr = pr[0] if pr else False
-            cache[domain] = pr
-        if not pr:
-            request_data = rule._prepare_purchase_request(
-                procurement.origin, procurement.values
-            )
-            pr = purchase_request_model.create(request_data)
-            cache[domain] = pr
-        elif (
-            not pr.origin
-            or procurement.origin not in pr.origin.split(", ")
-            and procurement.origin != "/"
-        ):
-            if pr.origin:
-                if procurement.origin:
-                    pr.write({"origin": pr.origin + ", " + procurement.origin})
+        groups = {}
+        for procurement, rule in procurements:
+            domain = rule._make_pr_get_domain(procurement.values)
+            # Without a domain, a procurement never extends another request
+            key = domain or object()
+            groups.setdefault(key, (domain, []))[1].append((procurement, rule))
+
+        requests = {}
+        to_create = []
+        for key, (domain, _group) in groups.items():
+            pr = purchase_request_model
+            if domain:
+                pr = purchase_request_model.search(list(domain), limit=1)
+            if pr:
+                requests[key] = pr
             else:
-                pr.write({"origin": procurement.origin})
-        # Create Line
-        request_line_data = rule._prepare_purchase_request_line(pr, procurement)
-        purchase_request_line_model.create(request_line_data)
+                to_create.append(key)
+        if to_create:
+            request_vals_list = []
+            for key in to_create:
+                procurement, rule = groups[key][1][0]
+                request_vals_list.append(
+                    rule._prepare_purchase_request(
+                        procurement.origin, procurement.values
+                    )
+                )
+            new_requests = purchase_request_model.create(request_vals_list)
+            requests.update(zip(to_create, new_requests, strict=True))
+        created_keys = set(to_create)
+
+        request_line_vals_list = []
+        for key, (_domain, group) in groups.items():
+            pr = requests[key]
+            origin = pr.origin
+            for i, (procurement, rule) in enumerate(group):
+                # The origin of a new request comes from its first procurement
+                if i or key not in created_keys:
+                    origin = self._merge_purchase_request_origin(
+                        origin, procurement.origin
+                    )
+                request_line_vals_list.append(
+                    rule._prepare_purchase_request_line(pr, procurement)
+                )
+            if origin != pr.origin:
+                pr.write({"origin": origin})
+        return self.env["purchase.request.line"].create(request_line_vals_list)
+
+    def create_purchase_request(self, procurement_group):
+        """
+        Create a purchase request containing procurement order product.
+        """
+        return self._create_purchase_requests([procurement_group])
@@ -1,6 +1,16 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
+
+# Warehouse fields read by the cached picking type map
+PICKING_TYPE_MAP_FIELDS = {
+    "active",
+    "company_id",
+    "in_type_id",
+    "int_type_id",
+    "project_id",
+    "sequence",
+}
 
 
 class StockWarehouse(models.Model):
@@ -29,9 +39,155 @@ class StockWarehouse(models.Model):
         "The project's analytic account will be used for purchase requests.",
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        warehouses = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return warehouses
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PICKING_TYPE_MAP_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_picking_type_map(self):
+        """Return the warehouse and picking type layout, cached.
+
+        The map is shared by the purchase requests, the purchase orders and
+        the transfer wizards, and is invalidated whenever a warehouse or a
+        picking type is created or deleted, or one of the fields it reads is
+        written. It is shared by all the users, so it holds the candidates of
+        every company in a fixed order: the helpers below return the first
+        candidate the current user can read in the allowed companies.
+
+        :return: dict with the keys
+            - ``warehouses_by_project``: {project id: warehouse ids}
+            - ``warehouses_by_company``: {company id: warehouse ids}
+            - ``types_by_warehouse``: {warehouse id: (incoming type ids,
+              internal type ids)}, the types set on the warehouse first
+            - ``incoming_types_by_company``: {company id: incoming type ids},
+              the types of the warehouses first
+        """
+        warehouses = self.sudo().search([], order="sequence, id")
+        picking_types = (
+            self.env["stock.picking.type"]
+            .sudo()
+            .search(
+                [("code", "in", ("incoming", "internal"))], order="sequence, id"
+            )
+        )
+        picking_type_ids = set(picking_types.ids)
+        types_by_warehouse_code = {}
+        incoming_types_by_company = {}
+        unassigned_incoming_types_by_company = {}
+        for picking_type in picking_types:
+            warehouse = picking_type.warehouse_id
+            types_by_warehouse_code.setdefault(
+                (warehouse.id, picking_type.code), []
+            ).append(picking_type.id)
+            if picking_type.code != "incoming":
+                continue
+            if warehouse:
+                incoming_types_by_company.setdefault(
+                    warehouse.company_id.id, []
+                ).append(picking_type.id)
+            else:
+                unassigned_incoming_types_by_company.setdefault(
+                    picking_type.company_id.id, []
+                ).append(picking_type.id)
+        for company_id, type_ids in unassigned_incoming_types_by_company.items():
+            incoming_types_by_company.setdefault(company_id, []).extend(type_ids)
+        warehouses_by_project = {}
+        warehouses_by_company = {}
+        types_by_warehouse = {}
+        for warehouse in warehouses:
+            if warehouse.project_id:
+                warehouses_by_project.setdefault(warehouse.project_id.id, []).append(
+                    warehouse.id
+                )
+            warehouses_by_company.setdefault(warehouse.company_id.id, []).append(
+                warehouse.id
+            )
+            # Prefer the types of the warehouse, unless they were archived
+            candidates = []
+            for type_id, code in (
+                (warehouse.in_type_id.id, "incoming"),
+                (warehouse.int_type_id.id, "internal"),
+            ):
+                type_ids = types_by_warehouse_code.get((warehouse.id, code), [])
+                if type_id in picking_type_ids:
+                    type_ids = [type_id] + [id_ for id_ in type_ids if id_ != type_id]
+                candidates.append(tuple(type_ids))
+            types_by_warehouse[warehouse.id] = tuple(candidates)
+        return tools.frozendict(
+            warehouses_by_project=tools.frozendict(
+                {key: tuple(ids) for key, ids in warehouses_by_project.items()}
+            ),
+            warehouses_by_company=tools.frozendict(
+                {key: tuple(ids) for key, ids in warehouses_by_company.items()}
+            ),
+            types_by_warehouse=tools.frozendict(types_by_warehouse),
+            incoming_types_by_company=tools.frozendict(
+                {key: tuple(ids) for key, ids in incoming_types_by_company.items()}
+            ),
+        )
+
+    @api.model
+    def _get_first_allowed(self, model_name, ids):
+        """Return the first of the records the user can read in the allowed
+        companies, the cached map being built without access rules."""
+        records = self.env[model_name].browse(ids)._filtered_access("read")
+        return records.filtered(lambda r: r.company_id in self.env.companies)[:1]
+
     @api.model
     def _get_warehouse_from_project(self, project):
         """Find the warehouse linked to a specific project."""
         if not project:
-            return False
-        return self.search([("project_id", "=", project.id)], limit=1)
+            return self.browse()
+        return self._get_first_allowed(
+            "stock.warehouse",
+            self._get_picking_type_map()["warehouses_by_project"].get(project.id, ()),
+        )
+
+    @api.model
+    def _get_company_warehouse(self, company):
+        """Return the first warehouse of a company."""
+        return self._get_first_allowed(
+            "stock.warehouse",
+            self._get_picking_type_map()["warehouses_by_company"].get(company.id, ()),
+        )
+
+    def _get_picking_types(self):
+        """Return the (incoming, internal) picking types of the warehouse."""
+        in_type_ids, int_type_ids = self._get_picking_type_map()[
+            "types_by_warehouse"
+        ].get(self.id, ((), ()))
+        return (
+            self._get_first_allowed("stock.picking.type", in_type_ids),
+            self._get_first_allowed("stock.picking.type", int_type_ids),
+        )
+
+    @api.model
+    def _get_project_picking_types(self, project):
+        """Return the (incoming, internal) picking types of the project's
+        warehouse."""
+        return self._get_warehouse_from_project(project)._get_picking_types()
+
+    @api.model
+    def _get_company_incoming_type(self, company):
+        """Return the incoming type of the warehouses of a company, or else
+        its first incoming type without warehouse."""
+        return self._get_first_allowed(
+            "stock.picking.type",
+            self._get_picking_type_map()["incoming_types_by_company"].get(
+                company.id, ()
+            ),
+        )
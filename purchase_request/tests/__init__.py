@@ -4,3 +4,5 @@ from . import test_purchase_request_allocation
 from . import test_purchase_request_procurement
 from . import test_purchase_request_to_rfq
 from . import test_purchase_request
+from . import test_purchase_request_report
+from . import test_purchase_request_performance
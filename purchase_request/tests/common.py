@@ -0,0 +1,110 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+
+from odoo import SUPERUSER_ID
+
+
+class PurchaseRequestDataFactory:
+    """Create purchase request test data in batch.
+
+    Every helper creates its records with a single ``create`` call where the
+    ORM allows it, so large data sets can be built quickly in tests.
+    """
+
+    def __init__(self, env):
+        self.env = env
+
+    def create_products(self, count, **vals):
+        return self.env["product.product"].create(
+            [
+                dict({"name": f"PR Product {index}", "type": "consu"}, **vals)
+                for index in range(count)
+            ]
+        )
+
+    def create_supplier(self, products=None, name="PR Supplier"):
+        supplier = self.env["res.partner"].create({"name": name})
+        if products:
+            self.env["product.supplierinfo"].create(
+                [
+                    {
+                        "partner_id": supplier.id,
+                        "product_tmpl_id": product.product_tmpl_id.id,
+                    }
+                    for product in products
+                ]
+            )
+        return supplier
+
+    def prepare_request_vals(self, products, product_qty=1.0, **vals):
+        uom_unit = self.env.ref("uom.product_uom_unit")
+        return dict(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": product.id,
+                            "product_uom_id": uom_unit.id,
+                            "product_qty": product_qty,
+                        },
+                    )
+                    for product in products
+                ],
+            },
+            **vals,
+        )
+
+    def create_request(self, products, product_qty=1.0, **vals):
+        return self.env["purchase.request"].create(
+            self.prepare_request_vals(products, product_qty=product_qty, **vals)
+        )
+
+    def make_purchase_order(self, requests, supplier):
+        wizard = (
+            self.env["purchase.request.line.make.purchase.order"]
+            .with_context(active_model="purchase.request", active_ids=requests.ids)
+            .create({"supplier_id": supplier.id})
+        )
+        wizard.make_purchase_order()
+        return requests.line_ids.purchase_lines.order_id
+
+    def create_warehouses(self, count):
+        return self.env["stock.warehouse"].create(
+            [
+                {"name": f"PR Warehouse {index}", "code": f"PRW{index:02d}"}
+                for index in range(count)
+            ]
+        )
+
+    def add_stock(self, products, locations, quantity):
+        return self.env["stock.quant"].create(
+            [
+                {
+                    "product_id": product.id,
+                    "location_id": location.id,
+                    "quantity": quantity,
+                }
+                for product in products
+                for location in locations
+            ]
+        )
+
+    def create_orderpoints(self, products, warehouse, **vals):
+        return self.env["stock.warehouse.orderpoint"].create(
+            [
+                dict(
+                    {
+                        "warehouse_id": warehouse.id,
+                        "location_id": warehouse.lot_stock_id.id,
+                        "product_id": product.id,
+                        "product_min_qty": 1.0,
+                        "product_max_qty": 5.0,
+                    },
+                    **vals,
+                )
+                for product in products
+            ]
+        )
@@ -1,9 +1,19 @@
 # Copyright 2018-2019 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+from unittest.mock import patch
+
 from odoo import SUPERUSER_ID, exceptions
 from odoo.exceptions import UserError
-from odoo.tests import Form, TransactionCase
+from odoo.tests import Form, TransactionCase, new_test_user
+
+from ..models.purchase_request import (
+    PROJECT_PLAN_ID,
+    get_analytic_account_ids,
+    get_analytic_plan_map,
+    parse_analytic_distribution_key,
+    replace_project_analytic,
+)
 
 
 class TestPurchaseRequest(TransactionCase):
@@ -310,3 +320,288 @@ class TestPurchaseRequest(TransactionCase):
         pr.button_draft()
         self.assertEqual(pr.state, "draft", "Should be in state draft")
         pr_lines.unlink()
+
+    def test_storekeeper_notification_digest(self):
+        warehouse = self.env.ref("stock.warehouse0")
+        warehouse.storekeeper_id = self.env["hr.employee"].create(
+            {"name": "Storekeeper", "work_email": "storekeeper@example.com"}
+        )
+        pickings = self.env["stock.picking"].create(
+            [
+                {
+                    "picking_type_id": warehouse.in_type_id.id,
+                    "location_id": self.env.ref("stock.stock_location_suppliers").id,
+                    "location_dest_id": warehouse.lot_stock_id.id,
+                }
+                for _i in range(3)
+            ]
+        )
+        queue = self.env.cr.postcommit.data[
+            "purchase_request.storekeeper_notifications"
+        ]
+        self.assertTrue(set(pickings.ids) <= queue)
+        mails_before = self.env["mail.mail"].search([])
+        pickings._send_storekeeper_notifications()
+        mails = self.env["mail.mail"].search([]) - mails_before
+        self.assertEqual(len(mails), 1, "One digest per storekeeper")
+        self.assertEqual(mails.email_to, "storekeeper@example.com")
+        for picking in pickings:
+            self.assertIn(picking.name, mails.body_html)
+
+    def test_button_done_multi(self):
+        """Closing several PRs at once goes through a single confirm wizard"""
+        purchase_requests = self.purchase_request | self.purchase_request_obj.create(
+            {
+                "picking_type_id": self.picking_type_id.id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.env.ref("product.product_product_16").id,
+                            "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                            "product_qty": 2.0,
+                        },
+                    )
+                ],
+            }
+        )
+        purchase_requests.button_approved()
+        action = purchase_requests.button_done()
+        wizard = self.env[action["res_model"]].browse(action["res_id"])
+        self.assertEqual(wizard.purchase_request_ids, purchase_requests)
+        self.assertFalse(wizard.purchase_request_id)
+        self.assertEqual(wizard.line_ids.pr_line_id, purchase_requests.line_ids)
+        self.assertEqual(wizard.line_ids.request_id, purchase_requests)
+        self.assertEqual(wizard.total_unfulfilled_qty, 7.0)
+        # Nothing is fulfilled, the PRs are not auto closed
+        purchase_requests.check_auto_done()
+        self.assertEqual(set(purchase_requests.mapped("state")), {"approved"})
+        # Once the lines are cancelled the PRs are considered fulfilled
+        purchase_requests.line_ids.write({"cancelled": True})
+        purchase_requests.check_auto_done()
+        self.assertEqual(set(purchase_requests.mapped("state")), {"done"})
+
+    def test_request_counters_and_transfers(self):
+        purchase_request = self.purchase_request
+        pr_line = purchase_request.line_ids
+        purchase_request.button_approved()
+        self.assertEqual(purchase_request.move_count, 0)
+        self.assertEqual(purchase_request.purchase_count, 0)
+        self.assertFalse(purchase_request.transfer_ids)
+        # RFQ created from the request
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request", active_ids=purchase_request.ids
+        ).create({"supplier_id": self.env.ref("base.res_partner_1").id})
+        wiz_id.make_purchase_order()
+        self.assertEqual(purchase_request.purchase_count, 1)
+        # Internal transfer allocated to the request
+        internal_type = self.env.ref("stock.picking_type_internal")
+        picking = self.env["stock.picking"].create(
+            {
+                "picking_type_id": internal_type.id,
+                "location_id": internal_type.default_location_src_id.id,
+                "location_dest_id": internal_type.default_location_dest_id.id,
+            }
+        )
+        move = self.env["stock.move"].create(
+            {
+                "name": pr_line.name,
+                "picking_id": picking.id,
+                "product_id": pr_line.product_id.id,
+                "product_uom": pr_line.product_uom_id.id,
+                "product_uom_qty": 1.0,
+                "location_id": picking.location_id.id,
+                "location_dest_id": picking.location_dest_id.id,
+            }
+        )
+        self.env["purchase.request.allocation"].create(
+            {
+                "purchase_request_line_id": pr_line.id,
+                "stock_move_id": move.id,
+                "requested_product_uom_qty": 1.0,
+            }
+        )
+        self.assertEqual(purchase_request.transfer_ids, picking)
+        self.assertEqual(purchase_request.transfer_count, 1)
+        self.assertEqual(purchase_request.move_count, 1)
+        # The link follows the picking type of the transfer
+        picking.picking_type_id = self.picking_type_id
+        self.assertFalse(purchase_request.transfer_ids)
+        self.assertEqual(purchase_request.transfer_count, 0)
+        picking.picking_type_id = internal_type
+        self.assertEqual(purchase_request.transfer_ids, picking)
+        move.purchase_request_allocation_ids.unlink()
+        self.assertFalse(purchase_request.transfer_ids)
+        self.assertEqual(purchase_request.move_count, 0)
+        # Allocations deleted along with their move by the database cascade
+        self.env["purchase.request.allocation"].create(
+            {
+                "purchase_request_line_id": pr_line.id,
+                "stock_move_id": move.id,
+                "requested_product_uom_qty": 1.0,
+            }
+        )
+        self.assertEqual(purchase_request.transfer_ids, picking)
+        move.unlink()
+        self.assertFalse(purchase_request.transfer_ids)
+
+    def test_unlink_line_with_transfer(self):
+        purchase_request = self.purchase_request
+        pr_line = purchase_request.line_ids
+        internal_type = self.env.ref("stock.picking_type_internal")
+        picking = self.env["stock.picking"].create(
+            {
+                "picking_type_id": internal_type.id,
+                "location_id": internal_type.default_location_src_id.id,
+                "location_dest_id": internal_type.default_location_dest_id.id,
+            }
+        )
+        move = self.env["stock.move"].create(
+            {
+                "name": pr_line.name,
+                "picking_id": picking.id,
+                "product_id": pr_line.product_id.id,
+                "product_uom": pr_line.product_uom_id.id,
+                "product_uom_qty": 1.0,
+                "location_id": picking.location_id.id,
+                "location_dest_id": picking.location_dest_id.id,
+            }
+        )
+        self.env["purchase.request.allocation"].create(
+            {
+                "purchase_request_line_id": pr_line.id,
+                "stock_move_id": move.id,
+                "requested_product_uom_qty": 1.0,
+            }
+        )
+        self.assertEqual(purchase_request.transfer_ids, picking)
+        pr_line.unlink()
+        self.assertFalse(purchase_request.transfer_ids)
+        self.assertEqual(purchase_request.transfer_count, 0)
+
+    def test_technical_description_text(self):
+        line = self.purchase_request.line_ids
+        line.technical_description = "<p>Steel&nbsp;&amp; <b>bolts</b></p><p>  M8 </p>"
+        self.assertEqual(line.technical_description_text, "Steel & bolts M8")
+        line.technical_description = "<p>%s</p>" % ("word " * 10000)
+        self.assertEqual(len(line.technical_description_text), 103)
+        self.assertTrue(line.technical_description_text.endswith("..."))
+        line.technical_description = False
+        self.assertFalse(line.technical_description_text)
+
+    def test_project_picking_type_map(self):
+        Warehouse = self.env["stock.warehouse"]
+        project = self.env["project.project"].create({"name": "PR Project"})
+        warehouse = Warehouse.create({"name": "PR Project Warehouse", "code": "PRPW"})
+        self.assertFalse(Warehouse._get_warehouse_from_project(project))
+        # Writing on the warehouse invalidates the cached map
+        warehouse.project_id = project
+        self.assertEqual(Warehouse._get_warehouse_from_project(project), warehouse)
+        in_type, int_type = Warehouse._get_project_picking_types(project)
+        self.assertEqual(in_type, warehouse.in_type_id)
+        self.assertEqual(int_type, warehouse.int_type_id)
+        purchase_request = self.purchase_request_obj.new({"project_id": project.id})
+        purchase_request._onchange_project_id()
+        self.assertEqual(purchase_request.picking_type_id, warehouse.in_type_id)
+        # Writing on a picking type invalidates it as well
+        new_in_type = warehouse.in_type_id.copy({"name": "PR Receipts"})
+        warehouse.in_type_id.active = False
+        self.assertEqual(
+            Warehouse._get_project_picking_types(project)[0], new_in_type
+        )
+        # Other fields do not invalidate it
+        with patch.object(self.env.registry, "clear_cache") as clear_cache:
+            warehouse.name = "PR Project Main Warehouse"
+            new_in_type.name = "PR Main Receipts"
+        clear_cache.assert_not_called()
+
+    def test_project_picking_type_map_companies(self):
+        Warehouse = self.env["stock.warehouse"]
+        project = self.env["project.project"].create({"name": "PR Project"})
+        other_company = self.env["res.company"].create({"name": "PR Other Company"})
+        other_warehouse = Warehouse.search([("company_id", "=", other_company.id)])
+        other_warehouse.project_id = project
+        self.assertEqual(
+            Warehouse.with_context(
+                allowed_company_ids=[other_company.id]
+            )._get_warehouse_from_project(project),
+            other_warehouse,
+        )
+        # The warehouses of the other companies are not returned
+        Warehouse = Warehouse.with_context(allowed_company_ids=self.env.company.ids)
+        self.assertFalse(Warehouse._get_warehouse_from_project(project))
+        self.assertFalse(Warehouse._get_company_warehouse(other_company))
+        other_warehouse = other_warehouse.with_env(Warehouse.env)
+        self.assertFalse(other_warehouse._get_picking_types()[0])
+        self.assertFalse(Warehouse._get_company_incoming_type(other_company))
+        self.assertEqual(
+            Warehouse._get_company_incoming_type(self.env.company).company_id,
+            self.env.company,
+        )
+
+    def test_project_picking_type_map_access(self):
+        Warehouse = self.env["stock.warehouse"]
+        project = self.env["project.project"].create({"name": "PR Project"})
+        user = new_test_user(
+            self.env,
+            login="pr_storekeeper",
+            groups="base.group_user,purchase_request.group_purchase_request_viewer",
+        )
+        first_warehouse, user_warehouse = Warehouse.create(
+            [
+                {"name": "PR First Warehouse", "code": "PRFW", "sequence": 1},
+                {"name": "PR Storekeeper Warehouse", "code": "PRSW", "sequence": 2},
+            ]
+        )
+        (first_warehouse | user_warehouse).project_id = project
+        user_warehouse.storekeeper_id = self.env["hr.employee"].create(
+            {"name": "PR Storekeeper", "user_id": user.id}
+        )
+        self.assertEqual(
+            Warehouse._get_warehouse_from_project(project), first_warehouse
+        )
+        # The cached map is shared, the record rules of the user still apply
+        UserWarehouse = Warehouse.with_user(user)
+        self.assertEqual(
+            UserWarehouse._get_warehouse_from_project(project), user_warehouse
+        )
+        in_type, _int_type = UserWarehouse._get_project_picking_types(project)
+        self.assertEqual(in_type, user_warehouse.in_type_id)
+
+    def test_replace_project_analytic_plan_map(self):
+        Account = self.env["account.analytic.account"]
+        project_plan = self.env["account.analytic.plan"].browse(PROJECT_PLAN_ID)
+        other_plan = self.env["account.analytic.plan"].create({"name": "PR Stages"})
+        old_project, new_project = Account.create(
+            [
+                {"name": "Old Project", "plan_id": project_plan.id},
+                {"name": "New Project", "plan_id": project_plan.id},
+            ]
+        )
+        stage = Account.create({"name": "Stage", "plan_id": other_plan.id})
+        distribution = {f"{old_project.id},{stage.id}": 100}
+        plan_by_account = get_analytic_plan_map(self.env, [distribution, None])
+        self.assertEqual(
+            plan_by_account, {old_project.id: project_plan.id, stage.id: other_plan.id}
+        )
+        expected = {str(stage.id): 100, str(new_project.id): 100}
+        self.assertEqual(
+            replace_project_analytic(
+                self.env, distribution, new_project.id, plan_by_account
+            ),
+            expected,
+        )
+        self.assertEqual(
+            replace_project_analytic(self.env, distribution, new_project.id), expected
+        )
+
+    def test_analytic_distribution_keys(self):
+        self.assertEqual(parse_analytic_distribution_key("242"), (242,))
+        self.assertEqual(parse_analytic_distribution_key("242, 410"), (242, 410))
+        self.assertEqual(parse_analytic_distribution_key("242,,x"), (242,))
+        self.assertEqual(
+            get_analytic_account_ids([{"242,410": 50, "7": 50}, None, {"410": 100}]),
+            {7, 242, 410},
+        )
@@ -1,6 +1,9 @@
 # Copyright 2018-2019 ForgeFlow, S.L.
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+from collections import Counter
+from unittest.mock import patch
+
 from odoo import SUPERUSER_ID
 from odoo.tests import Form, common
 
@@ -433,3 +436,140 @@ class TestPurchaseRequestToRfq(common.TransactionCase):
             }
         )
         self.assertEqual(purchase_request_line.supplier_id, vendor4)
+
+    def test_purchase_request_stock_allocation_summary_messages(self):
+        product2 = self.product_product.copy()
+        purchase_request = self.purchase_request.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": product.id,
+                            "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                            "product_qty": 3.0,
+                        },
+                    )
+                    for product in (self.product_product, product2)
+                ],
+            }
+        )
+        purchase_request.button_approved()
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request", active_ids=[purchase_request.id]
+        ).create({"supplier_id": self.env.ref("base.res_partner_1").id})
+        wiz_id.make_purchase_order()
+        purchase = purchase_request.line_ids.purchase_lines.order_id
+        purchase.order_line.write({"price_unit": 10})
+        purchase.button_confirm()
+        picking = purchase.picking_ids
+        for move in picking.move_ids:
+            move.quantity = move.product_uom_qty
+        picking.button_validate()
+        self.assertEqual(purchase_request.line_ids.mapped("qty_done"), [3.0, 3.0])
+        request_messages = purchase_request.message_ids.filtered(
+            lambda m: m.subtype_id
+            == self.env.ref("purchase_request.mt_request_picking_done")
+        )
+        self.assertEqual(len(request_messages), 1)
+        self.assertIn(product2.display_name, request_messages.body)
+        picking_messages = picking.message_ids.filtered(
+            lambda m: "Receipt confirmation for Request" in (m.body or "")
+        )
+        self.assertEqual(len(picking_messages), 1)
+
+    def test_allocation_recompute_once_per_pr_line(self):
+        """Validating a large receipt recomputes each PR line only once"""
+        line_count = 500
+        products = self.env["product.product"].create(
+            [{"name": f"Product {i}", "type": "consu"} for i in range(line_count)]
+        )
+        purchase_request = self.purchase_request.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": product.id,
+                            "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                            "product_qty": 1.0,
+                        },
+                    )
+                    for product in products
+                ],
+            }
+        )
+        purchase_request.button_approved()
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request", active_ids=[purchase_request.id]
+        ).create({"supplier_id": self.env.ref("base.res_partner_1").id})
+        wiz_id.make_purchase_order()
+        purchase = purchase_request.line_ids.purchase_lines.order_id
+        purchase.order_line.write({"price_unit": 10})
+        purchase.button_confirm()
+        picking = purchase.picking_ids
+        self.assertEqual(len(picking.move_ids), line_count)
+        for move in picking.move_ids:
+            move.quantity = move.product_uom_qty
+        self.env.flush_all()
+
+        pr_line_class = type(self.purchase_request_line)
+        compute_transfer_qty = pr_line_class._compute_transfer_qty
+        computed = Counter()
+
+        def _compute_transfer_qty(records):
+            computed.update(records.ids)
+            return compute_transfer_qty(records)
+
+        with patch.object(
+            pr_line_class, "_compute_transfer_qty", _compute_transfer_qty
+        ):
+            picking.button_validate()
+            self.env.flush_all()
+        self.assertEqual(set(computed), set(purchase_request.line_ids.ids))
+        self.assertEqual(set(computed.values()), {1})
+
+    def test_service_allocations_multiple_lines(self):
+        """Receiving services on several PO lines at once allocates each of them"""
+        service_products = self.service_product + self.env["product.product"].create(
+            {"name": "Product Service Test 2", "type": "service"}
+        )
+        purchase_request = self.purchase_request.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+            }
+        )
+        pr_lines = self.purchase_request_line.create(
+            [
+                {
+                    "request_id": purchase_request.id,
+                    "product_id": product.id,
+                    "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                    "product_qty": qty,
+                }
+                for product, qty in zip(service_products, (2.0, 3.0))
+            ]
+        )
+        purchase_request.button_approved()
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request.line", active_ids=pr_lines.ids
+        ).create({"supplier_id": self.env.ref("base.res_partner_1").id})
+        wiz_id.make_purchase_order()
+        po_lines = pr_lines.purchase_lines
+        self.assertEqual(len(po_lines), 2)
+        po_lines.write({"price_unit": 10})
+        po_lines.order_id.button_confirm()
+        allocations_by_line = po_lines._get_purchase_request_allocations_by_line()
+        self.assertEqual(set(allocations_by_line), set(po_lines.ids))
+        for line_id, allocations in allocations_by_line.items():
+            self.assertEqual(allocations.purchase_line_id.id, line_id)
+        po_lines.write({"qty_received": 1.0})
+        for pr_line in pr_lines:
+            self.assertEqual(pr_line.qty_done, 1.0)
@@ -0,0 +1,143 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+
+from odoo.tests import TransactionCase, tagged
+
+from .common import PurchaseRequestDataFactory
+
+
+@tagged("post_install", "-at_install")
+class TestPurchaseRequestPerformance(TransactionCase):
+    """Query budgets of the hot paths of the module.
+
+    The batched paths have a budget that does not depend on the size of the
+    data set. The paths creating purchase order lines or validating moves are
+    run on two data set sizes, and the queries added per extra record are
+    limited to what the batched code needs, so that an N+1 query added to one
+    of these paths makes the tests fail.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.factory = PurchaseRequestDataFactory(self.env)
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.cr.sql_log_count - start
+
+    def assertQueriesPerRecord(self, prepare, sizes, per_record):
+        """Check the queries added per record by a path.
+
+        :param prepare: function taking a data set size, preparing the data
+            and returning the function to measure
+        :param sizes: (small size, large size) of the two data sets
+        :param per_record: maximum number of queries per extra record
+        """
+        small, large = sizes
+        small_count = self._count_queries(prepare(small))
+        large_count = self._count_queries(prepare(large))
+        extra = large_count - small_count
+        self.assertLessEqual(
+            extra,
+            (large - small) * per_record,
+            f"{small_count} queries for {small} records, {large_count} for "
+            f"{large}: more than {per_record} queries per extra record",
+        )
+
+    def test_create_request_500_lines(self):
+        products = self.factory.create_products(500)
+        vals = self.factory.prepare_request_vals(products)
+        with self.assertQueryCount(150):
+            purchase_request = self.env["purchase.request"].create(vals)
+        self.assertEqual(len(purchase_request.line_ids), 500)
+
+    def test_make_purchase_order_500_items(self):
+        requests = self.env["purchase.request"]
+
+        def prepare(size):
+            nonlocal requests
+            products = self.factory.create_products(size)
+            supplier = self.factory.create_supplier(products)
+            purchase_request = self.factory.create_request(products)
+            purchase_request.button_approved()
+            wizard = (
+                self.env["purchase.request.line.make.purchase.order"]
+                .with_context(
+                    active_model="purchase.request", active_ids=purchase_request.ids
+                )
+                .create({"supplier_id": supplier.id})
+            )
+            requests |= purchase_request
+            return wizard.make_purchase_order
+
+        # The purchase order lines are created in batch
+        self.assertQueriesPerRecord(prepare, (100, 500), 2)
+        self.assertEqual(
+            [len(request.line_ids.purchase_lines) for request in requests],
+            [100, 500],
+        )
+
+    def test_check_availability_200_products_20_warehouses(self):
+        products = self.factory.create_products(200, is_storable=True)
+        warehouses = self.factory.create_warehouses(20)
+        self.factory.add_stock(products, warehouses.lot_stock_id, 10.0)
+        purchase_request = self.factory.create_request(products)
+        purchase_request.button_approved()
+        with self.assertQueryCount(100):
+            action = purchase_request.action_check_availability()
+        wizard = self.env[action["res_model"]].browse(action["res_id"])
+        self.assertEqual(len(wizard.line_ids), 200 * 20)
+        with self.assertQueryCount(20):
+            self.assertEqual(set(wizard.line_ids.mapped("available_qty")), {10.0})
+
+    def test_receipt_validation_500_moves(self):
+        requests = self.env["purchase.request"]
+
+        def prepare(size):
+            nonlocal requests
+            products = self.factory.create_products(size, is_storable=True)
+            supplier = self.factory.create_supplier(products)
+            purchase_request = self.factory.create_request(products)
+            purchase_request.button_approved()
+            purchase = self.factory.make_purchase_order(purchase_request, supplier)
+            purchase.order_line.write({"price_unit": 10})
+            purchase.button_confirm()
+            picking = purchase.picking_ids
+            for move in picking.move_ids:
+                move.quantity = move.product_uom_qty
+            requests |= purchase_request
+            return picking.button_validate
+
+        # The moves, move lines and allocations are processed in batch
+        self.assertQueriesPerRecord(prepare, (100, 500), 2)
+        self.assertEqual(set(requests.line_ids.mapped("qty_done")), {1.0})
+
+    def test_orderpoint_quantity_in_progress_5000(self):
+        products = self.factory.create_products(5000, is_storable=True)
+        orderpoints = self.factory.create_orderpoints(
+            products, self.env.ref("stock.warehouse0")
+        )
+        self.factory.create_request(
+            self.env["product.product"],
+            line_ids=[
+                (
+                    0,
+                    0,
+                    {
+                        "product_id": orderpoint.product_id.id,
+                        "product_uom_id": orderpoint.product_uom.id,
+                        "product_qty": 2.0,
+                        "orderpoint_id": orderpoint.id,
+                    },
+                )
+                for orderpoint in orderpoints[:1000]
+            ],
+        )
+        self.env.invalidate_all()
+        with self.assertQueryCount(50):
+            quantities = orderpoints._quantity_in_progress()
+        self.assertEqual(quantities[orderpoints[0].id], 2.0)
+        self.assertEqual(quantities[orderpoints[-1].id], 0.0)
@@ -167,3 +167,79 @@ class TestPurchaseRequestProcurement(common.TransactionCase):
         move4 = self._procurement_group_run("Split", self.product_1, 10)
         self.assertEqual(move4.created_purchase_request_line_id.request_id, pr)
         self.assertEqual(pr.origin, "Test Origin, Test, Split")
+
+    def test_orderpoint_quantity_in_progress_grouped(self):
+        """The grouped in progress quantity matches a per line computation"""
+        orderpoint = self.env["stock.warehouse.orderpoint"].create(
+            {
+                "name": __name__,
+                "warehouse_id": self.env.ref("stock.warehouse0").id,
+                "location_id": self.location.id,
+                "product_id": self.product_1.id,
+                "product_min_qty": 1,
+                "product_max_qty": 5,
+            }
+        )
+        base_qty = orderpoint._quantity_in_progress()[orderpoint.id]
+        purchase_request = self.pr_model.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product_1.id,
+                            "product_uom_id": self.env.ref(uom_xmlid).id,
+                            "product_qty": qty,
+                            "orderpoint_id": orderpoint.id,
+                        },
+                    )
+                    for uom_xmlid, qty in (
+                        ("uom.product_uom_unit", 3.0),
+                        ("uom.product_uom_unit", 4.0),
+                        ("uom.product_uom_dozen", 2.0),
+                    )
+                ],
+            }
+        )
+        expected_qty = sum(
+            line.product_uom_id._compute_quantity(
+                line.product_qty, orderpoint.product_uom, round=False
+            )
+            for line in self.prl_model.search(
+                orderpoint._get_purchase_request_line_in_progress_domain()
+            )
+        )
+        self.assertEqual(len(purchase_request.line_ids), 3)
+        self.assertAlmostEqual(expected_qty, 31.0)
+        self.assertAlmostEqual(
+            orderpoint._quantity_in_progress()[orderpoint.id] - base_qty,
+            expected_qty,
+        )
+
+    def test_run_buy_batch(self):
+        """Procurements of one scheduler run extend a single request"""
+        procurement_group = self.env["procurement.group"]
+        procurements = [
+            procurement_group.Procurement(
+                self.product_1,
+                qty,
+                self.product_1.uom_id,
+                self.location,
+                self.product_1.name,
+                origin,
+                self.env.company,
+                {
+                    "group_id": False,
+                    "route_ids": self.route_buy,
+                    "warehouse_id": self.env.ref("stock.warehouse0"),
+                },
+            )
+            for origin, qty in (("Batch A", 2.0), ("Batch B", 3.0), ("Batch A", 4.0))
+        ]
+        procurement_group.run(procurements)
+        pr = self.pr_model.search([("product_id", "=", self.product_1.id)])
+        self.assertEqual(len(pr), 1)
+        self.assertEqual(pr.origin, "Batch A, Batch B")
+        self.assertEqual(sorted(pr.line_ids.mapped("product_qty")), [2.0, 3.0, 4.0])
@@ -0,0 +1,69 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
+
+from odoo import SUPERUSER_ID
+from odoo.tests import TransactionCase
+
+
+class TestPurchaseRequestReport(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.report_obj = self.env["purchase.request.report"]
+        self.product = self.env["product.product"].create(
+            {"name": "Product Report Test", "type": "consu"}
+        )
+        self.purchase_request = self.env["purchase.request"].create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product.id,
+                            "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                            "product_qty": 4.0,
+                        },
+                    )
+                ],
+            }
+        )
+
+    def test_report_pipeline(self):
+        self.purchase_request.button_approved()
+        self.assertTrue(self.purchase_request.date_approved)
+        wiz_id = (
+            self.env["purchase.request.line.make.purchase.order"]
+            .with_context(
+                active_model="purchase.request",
+                active_ids=self.purchase_request.ids,
+            )
+            .create({"supplier_id": self.env.ref("base.res_partner_1").id})
+        )
+        wiz_id.make_purchase_order()
+        purchase = self.purchase_request.line_ids.purchase_lines.order_id
+        purchase.order_line.write({"price_unit": 10})
+        purchase.button_confirm()
+        picking = purchase.picking_ids
+        picking.move_ids.quantity = 4.0
+        picking.button_validate()
+        # The materialized view only reflects the data once refreshed
+        self.assertFalse(
+            self.report_obj.search([("request_id", "=", self.purchase_request.id)])
+        )
+        self.report_obj._refresh_view()
+        report = self.report_obj.search(
+            [("request_id", "=", self.purchase_request.id)]
+        )
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report.product_id, self.product)
+        self.assertEqual(report.categ_id, self.product.categ_id)
+        self.assertEqual(report.warehouse_id, picking.picking_type_id.warehouse_id)
+        self.assertEqual(report.product_qty, 4.0)
+        self.assertEqual(report.purchased_qty, 4.0)
+        self.assertEqual(report.received_qty, 4.0)
+        self.assertEqual(report.date_approved, self.purchase_request.date_approved)
+        self.assertTrue(report.date_rfq)
+        self.assertEqual(report.date_po_confirmed, purchase.date_approve)
+        self.assertTrue(report.date_received)
+        self.assertGreaterEqual(report.delay_total, 0.0)
@@ -425,3 +425,159 @@ class TestPurchaseRequestToRfq(common.TransactionCase):
         wiz_id.make_purchase_order()
         po_line = purchase_request["line_ids"][0].purchase_lines[0]
         self.assertEqual(po_line.analytic_distribution, analytic_distribution)
+
+    def test_purchase_request_to_rfq_split_by_supplier(self):
+        supplier1 = self.env["res.partner"].create({"name": "Supplier Split 1"})
+        supplier2 = self.env["res.partner"].create({"name": "Supplier Split 2"})
+        products = self.env["product.product"]
+        for supplier in (supplier1, supplier2):
+            products |= self.env["product.product"].create(
+                {
+                    "name": f"Product {supplier.name}",
+                    "type": "consu",
+                    "seller_ids": [(0, 0, {"partner_id": supplier.id})],
+                }
+            )
+        # A product without any seller, and no fallback supplier on the wizard
+        products |= self.env["product.product"].create(
+            {"name": "Product without seller", "type": "consu"}
+        )
+        purchase_request = self.purchase_request_obj.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": product.id,
+                            "product_uom_id": self.env.ref("uom.product_uom_unit").id,
+                            "product_qty": 2.0,
+                        },
+                    )
+                    for product in products
+                ],
+            }
+        )
+        purchase_request.button_approved()
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request",
+            active_ids=[purchase_request.id],
+        ).create({"split_by_supplier": True})
+        action = wiz_id.make_purchase_order()
+        self.assertEqual(action["params"]["type"], "warning")
+        self.assertIn("No supplier", action["params"]["message"])
+        lines = purchase_request.line_ids
+        orders = lines.purchase_lines.order_id
+        self.assertEqual(len(orders), 2)
+        self.assertEqual(orders.partner_id, supplier1 | supplier2)
+        self.assertFalse(
+            lines.filtered(lambda line: not line.supplier_id).purchase_lines
+        )
+        self.assertEqual(
+            sorted(action["params"]["next"]["domain"][0][2]), sorted(orders.ids)
+        )
+
+    def test_seller_map(self):
+        supplier = self.env["res.partner"].create({"name": "Supplier Map"})
+        expired = self.env["res.partner"].create({"name": "Supplier Expired"})
+        self.product_product.write(
+            {
+                "seller_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "partner_id": expired.id,
+                            "min_qty": 1.0,
+                            "sequence": 1,
+                            "date_end": "2000-01-01",
+                        },
+                    ),
+                    (0, 0, {"partner_id": supplier.id, "min_qty": 7.0, "sequence": 2}),
+                ]
+            }
+        )
+        seller_map = self.purchase_request_line_obj._get_seller_map(
+            self.product_product | self.service_product
+        )
+        self.assertEqual(
+            seller_map[self.product_product.id].partner_id,
+            supplier,
+            "Expired sellers should be ignored",
+        )
+        self.assertEqual(len(seller_map[self.service_product.id]), 1)
+        self.assertEqual(
+            self.purchase_request_line_obj._get_supplier_min_qty(
+                self.product_product, supplier, seller_map=seller_map
+            ),
+            7.0,
+        )
+        purchase_request = self.purchase_request_obj.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (0, 0, {"product_id": self.product_product.id, "product_qty": 1.0})
+                ],
+            }
+        )
+        self.assertEqual(purchase_request.line_ids.supplier_id, supplier)
+
+    def test_rfq_activities_batch(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "purchase_request.auto_activity", True
+        )
+        officer_group = self.env.ref("purchase_request.group_purchase_request_officer")
+        officer = self.env["res.users"].create(
+            {
+                "name": "Purchase Officer",
+                "login": "pr_officer_activities",
+                "groups_id": [(4, officer_group.id)],
+            }
+        )
+        officers = self.env["res.users"].search([("groups_id", "in", officer_group.id)])
+        purchase_requests = self.purchase_request_obj.create(
+            [
+                {
+                    "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                    "requested_by": SUPERUSER_ID,
+                    "line_ids": [
+                        (0, 0, {"product_id": self.product_product.id, "product_qty": 1.0})
+                    ],
+                }
+                for _i in range(3)
+            ]
+        )
+        purchase_requests.button_approved()
+        activities = self.env["mail.activity"].search(
+            [
+                ("res_model", "=", "purchase.request"),
+                ("res_id", "in", purchase_requests.ids),
+            ]
+        )
+        self.assertEqual(len(activities), len(purchase_requests) * len(officers))
+        self.assertIn(officer, activities.user_id)
+        self.assertEqual(
+            activities.activity_type_id, self.env.ref("mail.mail_activity_data_todo")
+        )
+        wiz_id = self.wiz.with_context(
+            active_model="purchase.request", active_ids=purchase_requests.ids
+        ).create({"supplier_id": self.env.ref("base.res_partner_12").id})
+        wiz_id.make_purchase_order()
+        self.assertFalse(activities.exists())
+        # No activity when the automated activities are skipped
+        purchase_request = self.purchase_request_obj.create(
+            {
+                "picking_type_id": self.env.ref("stock.picking_type_in").id,
+                "requested_by": SUPERUSER_ID,
+                "line_ids": [
+                    (0, 0, {"product_id": self.product_product.id, "product_qty": 1.0})
+                ],
+            }
+        )
+        purchase_request.with_context(
+            mail_activity_automation_skip=True
+        ).button_approved()
+        self.assertFalse(purchase_request.activity_ids)
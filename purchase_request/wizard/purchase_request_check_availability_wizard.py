@@ -1,5 +1,7 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0)
 
+from collections import defaultdict
+
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
@@ -24,66 +26,68 @@ class PurchaseRequestCheckAvailabilityWizard(models.TransientModel):
         """Create wizard lines for each PR line showing all locations with stock."""
         self.ensure_one()
         WizardLine = self.env["purchase.request.check.availability.wizard.line"]
-        StockQuant = self.env["stock.quant"]
+        request = self.purchase_request_id
 
         # Get the destination location from the PR's picking type
-        dest_location = self.purchase_request_id.picking_type_id.default_location_dest_id
-
-        for pr_line in self.purchase_request_id.line_ids.filtered(
-            lambda l: not l.cancelled and l.unfulfilled_qty > 0
-        ):
-            if not pr_line.product_id:
-                continue
+        dest_location = request.picking_type_id.default_location_dest_id
 
-            # Find all internal locations with available stock for this product
-            # across all warehouses in the company
-            quants = StockQuant.search([
-                ("product_id", "=", pr_line.product_id.id),
+        pr_lines = request.line_ids.filtered(
+            lambda l: not l.cancelled and l.unfulfilled_qty > 0 and l.product_id
+        )
+        # Find all internal locations with stock for the products across all
+        # warehouses in the company, for all the lines at once
+        groups = self.env["stock.quant"]._read_group(
+            [
+                ("product_id", "in", pr_lines.product_id.ids),
                 ("location_id.usage", "=", "internal"),
                 ("quantity", ">", 0),
-                ("company_id", "=", self.purchase_request_id.company_id.id),
-            ])
-
-            locations_with_stock = {}
-            for quant in quants:
-                location = quant.location_id
-                # Exclude the destination location (same warehouse destination)
-                if location == dest_location:
-                    continue
-                # Also exclude child locations of destination
-                if dest_location and location.parent_path and dest_location.parent_path:
-                    if location.parent_path.startswith(dest_location.parent_path):
-                        continue
-                if location not in locations_with_stock:
-                    # Get available quantity (excluding reserved)
-                    available = StockQuant._get_available_quantity(
-                        pr_line.product_id,
-                        location,
-                    )
-                    if available > 0:
-                        locations_with_stock[location] = available
+                ("company_id", "=", request.company_id.id),
+            ],
+            groupby=["product_id", "location_id"],
+        )
+        locations_by_product = defaultdict(list)
+        for product, location in groups:
+            # Exclude the destination location and its children
+            if location == dest_location or (
+                dest_location
+                and location.parent_path
+                and dest_location.parent_path
+                and location.parent_path.startswith(dest_location.parent_path)
+            ):
+                continue
+            locations_by_product[product].append(location)
+        locations = self.env["stock.location"].union(
+            *(location for product, location in groups)
+        )
+        # Get available quantities (excluding reserved)
+        available_qties = WizardLine._get_available_quantities(
+            pr_lines.product_id, locations
+        )
 
+        vals_list = []
+        for pr_line in pr_lines:
+            line_vals = {
+                "wizard_id": self.id,
+                "pr_line_id": pr_line.id,
+                "product_id": pr_line.product_id.id,
+                "requested_qty": pr_line.unfulfilled_qty,
+                "transfer_qty": 0.0,
+            }
+            locations_with_stock = [
+                location
+                for location in locations_by_product[pr_line.product_id]
+                if available_qties.get((pr_line.product_id.id, location.id), 0.0) > 0
+            ]
             if locations_with_stock:
                 # Create a line for each location that has stock
-                for location, available_qty in locations_with_stock.items():
-                    WizardLine.create({
-                        "wizard_id": self.id,
-                        "pr_line_id": pr_line.id,
-                        "product_id": pr_line.product_id.id,
-                        "location_id": location.id,
-                        "requested_qty": pr_line.unfulfilled_qty,
-                        "transfer_qty": 0.0,
-                    })
+                vals_list += [
+                    dict(line_vals, location_id=location.id)
+                    for location in locations_with_stock
+                ]
             else:
                 # No stock found anywhere - create line without location
-                WizardLine.create({
-                    "wizard_id": self.id,
-                    "pr_line_id": pr_line.id,
-                    "product_id": pr_line.product_id.id,
-                    "location_id": False,
-                    "requested_qty": pr_line.unfulfilled_qty,
-                    "transfer_qty": 0.0,
-                })
+                vals_list.append(dict(line_vals, location_id=False))
+        WizardLine.create(vals_list)
 
     def action_convert_to_transfer(self):
         """Open the create transfer wizard with selected lines."""
@@ -208,15 +212,45 @@ class PurchaseRequestCheckAvailabilityWizardLine(models.TransientModel):
     @api.depends("product_id", "location_id")
     def _compute_available_qty(self):
         """Compute available quantity at the selected location."""
+        lines = self.filtered(lambda l: l.product_id and l.location_id)
+        available_qties = self._get_available_quantities(
+            lines.product_id, lines.location_id
+        )
         for rec in self:
-            if rec.product_id and rec.location_id:
-                quant = self.env["stock.quant"]._get_available_quantity(
-                    rec.product_id,
-                    rec.location_id,
-                )
-                rec.available_qty = quant
-            else:
-                rec.available_qty = 0.0
+            rec.available_qty = available_qties.get(
+                (rec.product_id.id, rec.location_id.id), 0.0
+            )
+
+    @api.model
+    def _get_available_quantities(self, products, locations):
+        """Return the unreserved quantities of products in locations.
+
+        Like ``stock.quant._get_available_quantity``, the stock of the child
+        locations is included, but all the pairs are read with a single
+        grouped query.
+
+        :return: dict {(product id, location id): available quantity}
+        """
+        if not products or not locations:
+            return {}
+        groups = self.env["stock.quant"]._read_group(
+            [
+                ("product_id", "in", products.ids),
+                ("location_id", "child_of", locations.ids),
+            ],
+            groupby=["product_id", "location_id"],
+            aggregates=["quantity:sum", "reserved_quantity:sum"],
+        )
+        location_ids = set(locations.ids)
+        available_qties = defaultdict(float)
+        for product, location, quantity, reserved_quantity in groups:
+            # The stock counts for the location and all its requested parents
+            for parent_id in map(int, filter(None, location.parent_path.split("/"))):
+                if parent_id in location_ids:
+                    available_qties[product.id, parent_id] += (
+                        quantity - reserved_quantity
+                    )
+        return {key: max(qty, 0.0) for key, qty in available_qties.items()}
 
     @api.onchange("location_id")
     def _onchange_location_id(self):
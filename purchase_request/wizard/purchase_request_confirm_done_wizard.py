@@ -10,9 +10,19 @@ class PurchaseRequestConfirmDoneWizard(models.TransientModel):
     purchase_request_id = fields.Many2one(
         comodel_name="purchase.request",
         string="Purchase Request",
+        compute="_compute_purchase_request_id",
+        readonly=True,
+    )
+    purchase_request_ids = fields.Many2many(
+        comodel_name="purchase.request",
+        string="Purchase Requests",
         required=True,
         readonly=True,
     )
+    purchase_request_count = fields.Integer(
+        string="Purchase Request Count",
+        compute="_compute_purchase_request_id",
+    )
     line_ids = fields.One2many(
         comodel_name="purchase.request.confirm.done.wizard.line",
         inverse_name="wizard_id",
@@ -28,6 +38,14 @@ class PurchaseRequestConfirmDoneWizard(models.TransientModel):
         compute="_compute_totals",
     )
 
+    @api.depends("purchase_request_ids")
+    def _compute_purchase_request_id(self):
+        for rec in self:
+            rec.purchase_request_count = len(rec.purchase_request_ids)
+            rec.purchase_request_id = (
+                rec.purchase_request_ids if rec.purchase_request_count == 1 else False
+            )
+
     @api.depends("line_ids")
     def _compute_totals(self):
         for rec in self:
@@ -35,9 +53,9 @@ class PurchaseRequestConfirmDoneWizard(models.TransientModel):
             rec.total_unfulfilled_qty = sum(rec.line_ids.mapped("unfulfilled_qty"))
 
     def action_confirm_done(self):
-        """Confirm and mark the PR as done despite unfulfilled quantities."""
+        """Confirm and mark the PRs as done despite unfulfilled quantities."""
         self.ensure_one()
-        self.purchase_request_id.write({"state": "done"})
+        self.purchase_request_ids.write({"state": "done"})
         return {"type": "ir.actions.act_window_close"}
 
 
@@ -56,6 +74,10 @@ class PurchaseRequestConfirmDoneWizardLine(models.TransientModel):
         string="PR Line",
         readonly=True,
     )
+    request_id = fields.Many2one(
+        related="pr_line_id.request_id",
+        string="Purchase Request",
+    )
     product_id = fields.Many2one(
         comodel_name="product.product",
         string="Product",
@@ -47,42 +47,25 @@ class PurchaseRequestCreateTransferWizard(models.TransientModel):
         """Find internal transfer picking type from the source location's warehouse."""
         for rec in self:
             picking_type = False
-            if rec.line_ids:
-                # Get warehouse from first source location
-                source_location = rec.line_ids[0].source_location_id
-                if source_location:
-                    warehouse = source_location.warehouse_id
-                    if not warehouse:
-                        warehouse = self.env["stock.warehouse"].search(
-                            [("company_id", "=", rec.purchase_request_id.company_id.id)],
-                            limit=1,
-                        )
-                    if warehouse:
-                        picking_type = self.env["stock.picking.type"].search(
-                            [
-                                ("code", "=", "internal"),
-                                ("warehouse_id", "=", warehouse.id),
-                            ],
-                            limit=1,
-                        )
+            # Get warehouse from first source location
+            source_location = rec.line_ids[:1].source_location_id
+            if source_location:
+                picking_type = rec._find_internal_transfer_picking_type(
+                    source_location
+                )
             rec.picking_type_id = picking_type
 
     def _find_internal_transfer_picking_type(self, source_location):
         """Find internal transfer picking type from warehouse."""
+        Warehouse = self.env["stock.warehouse"]
         warehouse = source_location.warehouse_id
         if not warehouse:
-            warehouse = self.env["stock.warehouse"].search(
-                [("company_id", "=", self.purchase_request_id.company_id.id)],
-                limit=1,
+            warehouse = Warehouse._get_company_warehouse(
+                self.purchase_request_id.company_id
             )
         if warehouse:
-            return self.env["stock.picking.type"].search(
-                [
-                    ("code", "=", "internal"),
-                    ("warehouse_id", "=", warehouse.id),
-                ],
-                limit=1,
-            )
+            _in_type, int_type = warehouse._get_picking_types()
+            return int_type
         return False
 
     def action_create_transfer(self):
@@ -152,15 +135,6 @@ class PurchaseRequestCreateTransferWizard(models.TransientModel):
                     "requested_product_uom_qty": line.transfer_qty,
                 })
 
-        # Force recomputation of PR line quantities after creating allocations
-        pr_lines = self.line_ids.mapped("pr_line_id")
-        # Invalidate cache to ensure fresh computation
-        pr_lines.invalidate_recordset(["qty_in_transfer", "unfulfilled_qty"])
-        # Trigger recomputation by accessing the computed fields
-        for pr_line in pr_lines:
-            pr_line._compute_transfer_qty()
-            pr_line._compute_unfulfilled_qty()
-
         # Update PR state to in_progress if not already
         if self.purchase_request_id.state == "approved":
             self.purchase_request_id.button_in_progress()
@@ -5,9 +5,11 @@ from datetime import datetime
 import pytz
 
 from odoo import _, api, fields, models
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from odoo.tools import get_lang
 
+from ..models.purchase_request import get_analytic_account_ids
+
 
 class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
     _name = "purchase.request.line.make.purchase.order"
@@ -16,7 +18,6 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
     supplier_id = fields.Many2one(
         comodel_name="res.partner",
         string="Supplier",
-        required=True,
         context={"res_partner_search_mode": "supplier"},
     )
     item_ids = fields.One2many(
@@ -36,6 +37,13 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
             "if the scheduled date matches as well."
         ),
     )
+    split_by_supplier = fields.Boolean(
+        string="One RFQ per Supplier",
+        help="Group the selected lines by their preferred supplier and create "
+        "one RFQ per supplier. Each supplier is processed on its own, so a "
+        "failing group does not prevent the RFQs of the other suppliers. "
+        "The supplier above is used for lines without a preferred supplier.",
+    )
 
     @api.model
     def _prepare_item(self, line):
@@ -164,7 +172,7 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         )
 
     @api.model
-    def _prepare_purchase_order_line(self, po, item):
+    def _prepare_purchase_order_line(self, po, item, seller_map=None):
         if not item.product_id:
             raise UserError(_("Please select a product for all lines"))
         product = item.product_id
@@ -175,7 +183,9 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
             item.product_qty, product.uom_po_id or product.uom_id
         )
         # Suggest the supplier min qty as it's done in Odoo core
-        min_qty = item.line_id._get_supplier_min_qty(product, po.partner_id)
+        min_qty = item.line_id._get_supplier_min_qty(
+            product, po.partner_id, seller_map=seller_map
+        )
         qty = max(qty, min_qty)
         date_required = item.line_id.date_required
         return {
@@ -203,8 +213,8 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         return name
 
     @api.model
-    def _get_order_line_search_domain(self, order, item):
-        vals = self._prepare_purchase_order_line(order, item)
+    def _get_order_line_search_domain(self, order, item, seller_map=None):
+        vals = self._prepare_purchase_order_line(order, item, seller_map=seller_map)
         name = self._get_purchase_line_name(order, item)
         order_line_data = [
             ("order_id", "=", order.id),
@@ -214,7 +224,11 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         ]
 
         if item.line_id.analytic_distribution:
-            analytic_account_ids = list(item.line_id.analytic_distribution.keys())
+            # Search on the account IDs, matched by the GIN index of analytic.mixin
+            # (the keys are strings, possibly several comma-separated IDs)
+            analytic_account_ids = list(
+                get_analytic_account_ids([item.line_id.analytic_distribution])
+            )
             order_line_data.append(
                 ("analytic_distribution", "in", analytic_account_ids)
             )
@@ -231,10 +245,16 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         return order_line_data
 
     def make_purchase_order(self):
+        if self.split_by_supplier:
+            return self._make_purchase_order_by_supplier()
         res = []
         purchase_obj = self.env["purchase.order"]
         po_line_obj = self.env["purchase.order.line"]
         purchase = False
+        # Resolve the sellers of all items at once, reused for every PO line
+        seller_map = self.env["purchase.request.line"]._get_seller_map(
+            self.item_ids.product_id, company=self.item_ids.line_id.company_id[:1]
+        )
         for item in self.item_ids:
             line = item.line_id
             if item.product_qty <= 0.0:
@@ -253,7 +273,9 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
             # Look for any other PO line in the selected PO with same
             # product and UoM to sum quantities instead of creating a new
             # po line
-            domain = self._get_order_line_search_domain(purchase, item)
+            domain = self._get_order_line_search_domain(
+                purchase, item, seller_map=seller_map
+            )
             available_po_lines = po_line_obj.search(domain)
             new_pr_line = True
             # If Unit of Measure is not set, update from wizard.
@@ -276,7 +298,9 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
                 all_qty = min(po_line_product_uom_qty, wizard_product_uom_qty)
                 self.create_allocation(po_line, line, all_qty, alloc_uom)
             else:
-                po_line_data = self._prepare_purchase_order_line(purchase, item)
+                po_line_data = self._prepare_purchase_order_line(
+                    purchase, item, seller_map=seller_map
+                )
                 po_line = po_line_obj.create(po_line_data)
                 po_line_product_uom_qty = po_line.product_uom._compute_quantity(
                     po_line.product_uom_qty, alloc_uom
@@ -286,7 +310,9 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
                 )
                 all_qty = min(po_line_product_uom_qty, wizard_product_uom_qty)
                 self.create_allocation(po_line, line, all_qty, alloc_uom)
-            self._post_process_po_line(item, po_line, new_pr_line)
+            self._post_process_po_line(
+                item, po_line, new_pr_line, seller_map=seller_map
+            )
             res.append(purchase.id)
 
         purchase_requests = self.item_ids.mapped("request_id")
@@ -295,8 +321,12 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         # Handle RFQ activities - mark current user's as done, cancel others
         self._handle_rfq_activities(purchase_requests)
 
+        return self._get_purchase_order_action(res)
+
+    @api.model
+    def _get_purchase_order_action(self, purchase_ids):
         return {
-            "domain": [("id", "in", res)],
+            "domain": [("id", "in", purchase_ids)],
             "name": _("RFQ"),
             "view_mode": "list,form",
             "res_model": "purchase.order",
@@ -305,6 +335,77 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
             "type": "ir.actions.act_window",
         }
 
+    def _get_items_by_supplier(self):
+        """Group the wizard items by the preferred supplier of their PR line.
+
+        Lines without a preferred supplier fall back to the wizard supplier.
+        """
+        self.ensure_one()
+        items_by_supplier = {}
+        for item in self.item_ids:
+            supplier = item.line_id.supplier_id or self.supplier_id
+            items_by_supplier.setdefault(supplier, self.item_ids.browse())
+            items_by_supplier[supplier] |= item
+        return items_by_supplier
+
+    def _make_purchase_order_by_supplier(self):
+        """Create one RFQ per supplier, each one inside its own savepoint.
+
+        A group that fails (missing supplier, invalid quantity, analytic
+        constraint...) is rolled back on its own and reported to the buyer
+        together with the RFQs that could be created.
+        """
+        self.ensure_one()
+        # Sub-wizards must not rebuild their items from the active records
+        wizard_obj = self.with_context(active_model=False, active_ids=[])
+        purchases = self.env["purchase.order"]
+        failed_groups = []
+        for supplier, items in self._get_items_by_supplier().items():
+            try:
+                with self.env.cr.savepoint():
+                    wizard = wizard_obj.create(
+                        {
+                            "supplier_id": supplier.id,
+                            "sync_data_planned": self.sync_data_planned,
+                        }
+                    )
+                    items.write({"wiz_id": wizard.id})
+                    action = wizard.make_purchase_order()
+                    purchases |= purchases.browse(action["domain"][0][2])
+            except (UserError, ValidationError) as e:
+                failed_groups.append(
+                    _(
+                        "%(supplier)s (%(count)s lines): %(error)s",
+                        supplier=supplier.display_name or _("No supplier"),
+                        count=len(items),
+                        error=e.args[0],
+                    )
+                )
+        return self._get_split_summary_action(purchases, failed_groups)
+
+    def _get_split_summary_action(self, purchases, failed_groups):
+        message = _(
+            "%(count)s RFQ(s) created: %(names)s",
+            count=len(purchases),
+            names=", ".join(purchases.mapped("name")) or "-",
+        )
+        if failed_groups:
+            message += "\n" + _("Failed supplier groups:") + "\n"
+            message += "\n".join(failed_groups)
+        params = {
+            "title": _("RFQ"),
+            "message": message,
+            "type": "warning" if failed_groups else "success",
+            "sticky": bool(failed_groups),
+        }
+        if purchases:
+            params["next"] = self._get_purchase_order_action(purchases.ids)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": params,
+        }
+
     def _handle_rfq_activities(self, purchase_requests):
         """Mark current user's RFQ activity as done and cancel others."""
         # Check if feature is enabled
@@ -313,32 +414,33 @@ class PurchaseRequestLineMakePurchaseOrder(models.TransientModel):
         ):
             return
 
-        current_user = self.env.user
-        Activity = self.env['mail.activity']
-
-        for pr in purchase_requests:
-            # Find all RFQ activities for this PR (activities with "Create RFQ" in summary)
-            activities = Activity.search([
-                ('res_model', '=', 'purchase.request'),
-                ('res_id', '=', pr.id),
-                ('summary', 'ilike', 'Create RFQ'),
-            ])
-
-            for activity in activities:
-                if activity.user_id == current_user:
-                    # Mark current user's activity as done
-                    activity.action_feedback(feedback=_("RFQ created"))
-                else:
-                    # Cancel/unlink other users' activities
-                    activity.unlink()
-
-    def _post_process_po_line(self, item, po_line, new_pr_line):
+        # Find the RFQ activities of all the PRs at once (activities with
+        # "Create RFQ" in summary)
+        activities = self.env['mail.activity'].search([
+            ('res_model', '=', 'purchase.request'),
+            ('res_id', 'in', purchase_requests.ids),
+            ('summary', 'ilike', 'Create RFQ'),
+        ])
+        own_activities = activities.filtered(
+            lambda activity: activity.user_id == self.env.user
+        )
+        # Cancel/unlink other users' activities
+        (activities - own_activities).unlink()
+        # Mark current user's activities as done
+        if own_activities:
+            own_activities.action_feedback(feedback=_("RFQ created"))
+
+    def _post_process_po_line(self, item, po_line, new_pr_line, seller_map=None):
         self.ensure_one()
         line = item.line_id
         user_tz = pytz.timezone(self.env.user.tz or "UTC")
         # Pass the wizard item's quantity to use instead of the PR line's original qty
         new_qty = self.env["purchase.request.line"]._calc_new_qty(
-            line, po_line=po_line, new_pr_line=new_pr_line, wizard_qty=item.product_qty
+            line,
+            po_line=po_line,
+            new_pr_line=new_pr_line,
+            wizard_qty=item.product_qty,
+            seller_map=seller_map,
         )
         po_line.product_qty = new_qty
         # The quantity update triggers a compute method that alters the
@@ -394,13 +496,10 @@ class PurchaseRequestLineMakePurchaseOrderItem(models.TransientModel):
         if self.product_id:
             name = self.product_id.name
             code = self.product_id.code
-            sup_info_id = self.env["product.supplierinfo"].search(
-                [
-                    "|",
-                    ("product_id", "=", self.product_id.id),
-                    ("product_tmpl_id", "=", self.product_id.product_tmpl_id.id),
-                    ("partner_id", "=", self.wiz_id.supplier_id.id),
-                ]
+            sup_info_id = (
+                self.env["purchase.request.line"]
+                ._get_product_sellers(self.product_id)
+                .filtered(lambda s: s.partner_id == self.wiz_id.supplier_id)
             )
             if sup_info_id:
                 p_code = sup_info_id[0].product_code